@@ -0,0 +1,27 @@
+"""Add index for pending location reminders.
+
+Revision ID: 0012_task_location_index
+Revises: 0011_task_start_prompt
+Create Date: 2026-01-02 10:00:00
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0012_task_location_index"
+down_revision = "0011_task_start_prompt"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_tasks_user_location_pending",
+        "tasks",
+        ["user_id", "location_reminder_sent_at", "location_lat", "location_lon"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_user_location_pending", table_name="tasks")
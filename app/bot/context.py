@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 import datetime as dt
+import time
 from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
 
 from telegram import Update
@@ -12,12 +15,23 @@ from app.db import SessionLocal
 from app.i18n.core import locale_for_user, t
 
 
+# Session of the update being handled; each update runs in its own asyncio task.
+_current_session: ContextVar = ContextVar("bot_db_session", default=None)
+
+
 @contextmanager
 def get_db_session():
+    """One session per update: nested uses (text -> command dispatch) share the outer one."""
+    db = _current_session.get()
+    if db is not None:
+        yield db
+        return
     db = SessionLocal()
+    token = _current_session.set(db)
     try:
         yield db
     finally:
+        _current_session.reset(token)
         db.close()
 
 
@@ -61,5 +75,84 @@ async def get_ready_user(
     return user
 
 
+async def run_db(fn, *args, **kwargs):
+    """Run a multi-statement blocking DB call in a worker thread.
+
+    The caller awaits the result, so the session is never used from two threads
+    at once; this only keeps the event loop free while the statements run.
+    """
+    return await asyncio.to_thread(fn, *args, **kwargs)
+
+
 def build_user_context(user, routine) -> UserContext:
     return UserContext(user=user, routine=routine, now=dt.datetime.now().replace(microsecond=0))
+
+
+_BUSY_CACHE_TTL_SEC = 30.0
+
+
+def cached_busy(context, user_id: int, day: dt.date, stamp) -> list | None:
+    """Busy intervals computed by a recent update for this day, if still fresh.
+
+    Bot writes drop the cache through forget_busy;
+    the short TTL bounds staleness from writes made outside the bot.
+    """
+    user_data = getattr(context, "user_data", None)
+    if user_data is None:
+        return None
+    entry = user_data.get("_busy_cache", {}).get((user_id, day))
+    if entry is None or entry[1] != stamp or time.monotonic() - entry[0] > _BUSY_CACHE_TTL_SEC:
+        return None
+    return entry[2]
+
+
+def store_busy(context, user_id: int, day: dt.date, stamp, busy: list) -> None:
+    user_data = getattr(context, "user_data", None)
+    if user_data is not None:
+        user_data.setdefault("_busy_cache", {})[(user_id, day)] = (time.monotonic(), stamp, busy)
+
+
+def forget_busy(context, user_id: int, *days: dt.date | None) -> None:
+    """Drop cached busy intervals after a write to the given days; no days drops them all."""
+    user_data = getattr(context, "user_data", None)
+    if user_data is None:
+        return
+    cache = user_data.get("_busy_cache")
+    if not cache:
+        return
+    if not days:
+        for key in [k for k in cache if k[0] == user_id]:
+            del cache[key]
+        return
+    for day in days:
+        if day is not None:
+            cache.pop((user_id, day), None)
+
+
+_LOCALE_CACHE_TTL_SEC = 60.0
+
+
+def cached_locale(context) -> str | None:
+    """The chat's locale as resolved by a recent update, for replies that need no user row.
+
+    /lang drops it through forget_locale; the TTL bounds staleness from API profile edits.
+    """
+    user_data = getattr(context, "user_data", None)
+    if user_data is None:
+        return None
+    entry = user_data.get("_locale_cache")
+    if entry is None or time.monotonic() - entry[0] > _LOCALE_CACHE_TTL_SEC:
+        return None
+    return entry[1]
+
+
+def store_locale(context, locale: str) -> None:
+    user_data = getattr(context, "user_data", None)
+    if user_data is not None:
+        user_data["_locale_cache"] = (time.monotonic(), locale)
+
+
+def forget_locale(context) -> None:
+    user_data = getattr(context, "user_data", None)
+    if user_data is not None:
+        user_data.pop("_locale_cache", None)
@@ -2,7 +2,7 @@ from telegram import Update
 from telegram.ext import ContextTypes
 
 from app import crud
-from app.bot.context import get_db_session, get_user
+from app.bot.context import forget_locale, get_db_session, get_user
 from app.bot.handlers.routine import start_onboarding
 from app.bot.rendering.account import cabinet_message, me_message, token_message
 from app.bot.rendering.help import start_help_message
@@ -110,6 +110,7 @@ async def cmd_lang(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
             await update.message.reply_text(t("lang.invalid", locale=locale))
             return
         crud.update_user_fields(db, user.id, preferred_language=value)
+        forget_locale(context)
         await update.message.reply_text(
             t("lang.set", locale=value, lang=value)
         )
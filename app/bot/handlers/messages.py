@@ -10,7 +10,7 @@ from telegram import Update
 from telegram.ext import ContextTypes
 
 from app import crud
-from app.bot.context import get_active_user as _get_active_user, get_db_session
+from app.bot.context import forget_busy, get_active_user as _get_active_user, get_db_session, run_db
 from app.bot.handlers.core import cmd_cabinet, cmd_login, cmd_logout, cmd_me, cmd_setup, cmd_start
 from app.bot.handlers.health import cmd_habit, cmd_health, cmd_workout
 from app.bot.handlers.location import cmd_task_location
@@ -23,7 +23,10 @@ from app.bot.handlers.routine import (
     handle_onboarding_text as _handle_onboarding_text,
 )
 from app.bot.handlers.tasks import (
+    PendingAction,
     apply_task_actions as _apply_task_actions,
+    cached_list_tasks as _cached_list_tasks,
+    format_task_choices as _format_task_choices,
     cmd_autoplan,
     cmd_call,
     cmd_capture,
@@ -43,11 +46,13 @@ from app.bot.handlers.tasks import (
     handle_task_request as _handle_task_request,
     prompt_task_selection as _prompt_task_selection,
 )
+from app.bot.middleware.throttle import update_user_key
 from app.bot.parsing.commands import parse_command_text as _parse_command_text
 from app.bot.parsing.ru_reply import parse_reply
 from app.bot.parsing.text import (
     extract_routine_items as _extract_routine_items,
     extract_task_ids as _extract_task_ids,
+    extract_task_ids_from_args as _extract_task_ids_from_args,
     split_items as _split_items,
 )
 from app.bot.parsing.time import (
@@ -106,7 +111,8 @@ async def _acquire_heavy_lock(user, update: Update, *, text: str | None, locale:
                 reply_markup=yes_no_cancel_keyboard(locale),
             )
         return None
-    lock = throttle().get_lock(_user_key(user))
+    # Same key as wrap_throttled, so both paths share one heavy lock under the serial lock.
+    lock = throttle().get_lock(update_user_key(update))
     if lock.locked():
         await update.message.reply_text(t("bot.throttle.busy", locale=locale))
         return None
@@ -114,8 +120,11 @@ async def _acquire_heavy_lock(user, update: Update, *, text: str | None, locale:
     return lock
 
 
+_PERSON_NAME_RE = re.compile(r"\b(?:с|со)\s+([А-Яа-яA-Za-z][^,.;!?]+)")
+
+
 def _extract_person_name(text: str) -> str | None:
-    m = re.search(r"\b(?:с|со)\s+([А-Яа-яA-Za-z][^,.;!?]+)", text)
+    m = _PERSON_NAME_RE.search(text)
     if not m:
         return None
     name = m.group(1).strip()
@@ -220,8 +229,11 @@ async def _handle_pending_suggestion(
     return True
 
 
+_PUNCT_RE = re.compile(r"[^\w\s]")
+
+
 def _looks_like_greeting(text: str) -> bool:
-    lower = re.sub(r"[^\w\s]", "", text.strip().lower())
+    lower = _PUNCT_RE.sub("", text.strip().lower())
     return lower in {
         "привет",
         "приветик",
@@ -313,10 +325,7 @@ def _build_assistant_context(db, user) -> str:
     now = _now_local_naive()
     routine = crud.get_routine(db, user.id)
     day = now.date()
-    tasks = crud.list_tasks_for_day(db, user.id, day)
-    scheduled = [t for t in tasks if t.planned_start and not t.is_done]
-    backlog = [t for t in tasks if t.planned_start is None and not t.is_done and t.task_type == "user"]
-    scheduled.sort(key=lambda t: t.planned_start)
+    scheduled, backlog = crud.get_plan_buckets(db, user.id, day)
 
     display_name = user.full_name or "user"
     lines = [
@@ -446,7 +455,7 @@ async def _handle_pending_start_prompt(
     if flags.is_yes or flags.is_no or flags.is_cancel:
         context.user_data["pending_start_prompt_ids"] = [t.id for t in pending]
         lines = [t("start_prompt.choose", locale=locale)]
-        lines.extend([_format_task_choice(t, routine, locale) for t in pending])
+        lines.extend(_format_task_choices(pending, routine, locale))
         await update.message.reply_text("\n".join(lines))
         return True
 
@@ -461,47 +470,40 @@ def _sanitize_ai_reply(reply: str | None, locale: str) -> str | None:
     return reply
 
 
-def _format_task_choice(task, routine, locale: str) -> str:
-    if task.planned_start:
-        when = task.planned_start.strftime("%H:%M")
-    elif task.due_at:
-        when = task.due_at.strftime("%Y-%m-%d %H:%M")
-    else:
-        when = t("tasks.choice.no_time", locale=locale)
-    mins = task_display_minutes(task, routine)
-    return t(
-        "tasks.choice.line",
-        locale=locale,
-        task_id=task.id,
-        title=task.title,
-        when=when,
-        minutes=mins,
-    )
+# Intent detectors run on every free-text message; compile them once.
+_PLAN_REQUEST_RE = re.compile(r"\b(план|расписание|график|розклад|plan)\b", re.IGNORECASE)
+_TASKS_REQUEST_RE = re.compile(r"\b(задач|задачи|список задач|todo|tasks)\b", re.IGNORECASE)
+_BACKLOG_REQUEST_RE = re.compile(r"\b(бэклог|беклог|backlog)\b", re.IGNORECASE)
+_BREAKFAST_REQUEST_RE = re.compile(r"\b(завтрак|breakfast)\b", re.IGNORECASE)
+_AUTOPLAN_REQUEST_RE = re.compile(r"\b(автоплан|autoplan|распланируй|распланировать)\b", re.IGNORECASE)
+_RESCHEDULE_VERB_RE = re.compile(
+    r"\b(перенеси|перенести|сдвинь|сдвинуть|перепланируй|перепланировать|запланируй|поставь)\b"
+)
 
 
 def _is_plan_request(text: str) -> bool:
-    return bool(re.search(r"\b(план|расписание|график|розклад|plan)\b", text, flags=re.IGNORECASE))
+    return bool(_PLAN_REQUEST_RE.search(text))
 
 
 def _is_tasks_request(text: str) -> bool:
-    return bool(re.search(r"\b(задач|задачи|список задач|todo|tasks)\b", text, flags=re.IGNORECASE))
+    return bool(_TASKS_REQUEST_RE.search(text))
 
 
 def _is_backlog_request(text: str) -> bool:
-    return bool(re.search(r"\b(бэклог|беклог|backlog)\b", text, flags=re.IGNORECASE))
+    return bool(_BACKLOG_REQUEST_RE.search(text))
 
 
 def _is_breakfast_request(text: str) -> bool:
-    return bool(re.search(r"\b(завтрак|breakfast)\b", text, flags=re.IGNORECASE))
+    return bool(_BREAKFAST_REQUEST_RE.search(text))
 
 
 def _is_autoplan_request(text: str) -> bool:
-    return bool(re.search(r"\b(автоплан|autoplan|распланируй|распланировать)\b", text, flags=re.IGNORECASE))
+    return bool(_AUTOPLAN_REQUEST_RE.search(text))
 
 
 def _parse_reschedule_request(text: str, now: dt.datetime) -> dict | None:
     lower = text.lower()
-    if not re.search(r"\b(перенеси|перенести|сдвинь|сдвинуть|перепланируй|перепланировать|запланируй|поставь)\b", lower):
+    if not _RESCHEDULE_VERB_RE.search(lower):
         return None
     ids = _extract_task_ids(text)
     if not ids:
@@ -524,14 +526,16 @@ def _parse_reschedule_request(text: str, now: dt.datetime) -> dict | None:
     }
 
 
+_ACTION_PUNCT_RE = re.compile(r"[^\w\s-]")
+_ACTION_FILLER_RE = re.compile(
+    r"\b(удали|удалить|удалилась|удалился|задача|задачи|пожалуйста|плиз|прошу|нужно|надо)\b"
+)
+
+
 def _normalize_action_text(text: str) -> str:
     cleaned = text.lower()
-    cleaned = re.sub(r"[^\w\s-]", " ", cleaned)
-    cleaned = re.sub(
-        r"\b(удали|удалить|удалилась|удалился|задача|задачи|пожалуйста|плиз|прошу|нужно|надо)\b",
-        " ",
-        cleaned,
-    )
+    cleaned = _ACTION_PUNCT_RE.sub(" ", cleaned)
+    cleaned = _ACTION_FILLER_RE.sub(" ", cleaned)
     return " ".join(cleaned.split()).strip()
 
 
@@ -546,9 +550,10 @@ def _match_tasks_by_title(tasks: list, query: str) -> list:
     return hits
 
 
-def _resolve_done_candidate(db, user, routine, now: dt.datetime) -> list:
+def _resolve_done_candidate(db, user, routine, now: dt.datetime, context=None) -> list:
     day = now.date()
-    tasks = crud.list_tasks_for_day(db, user.id, day)
+    # Shared with _prompt_task_selection, which reads the same day when nothing matches.
+    tasks = _cached_list_tasks(context, db, user.id, day)
     scheduled = [t for t in tasks if t.planned_start and not t.is_done]
     if not scheduled:
         return []
@@ -567,9 +572,12 @@ def _resolve_done_candidate(db, user, routine, now: dt.datetime) -> list:
     return []
 
 
+_AUTOPLAN_DAYS_RE = re.compile(r"\b(\d{1,2})\b")
+
+
 def _parse_autoplan_args(text: str) -> list[str]:
     days = None
-    m = re.search(r"\b(\d{1,2})\b", text)
+    m = _AUTOPLAN_DAYS_RE.search(text)
     if m:
         days = m.group(1)
     date_match = DATE_TOKEN_RE.search(text)
@@ -705,6 +713,7 @@ async def _handle_pending_clear(
         count_tasks = crud.delete_all_tasks(db, user.id)
     if "routine" in targets:
         count_steps = crud.delete_all_routine_steps(db, user.id)
+    forget_busy(context, user.id)
     await update.message.reply_text(
         t("clear_all.done", locale=locale, tasks=count_tasks, steps=count_steps)
     )
@@ -821,10 +830,9 @@ async def _handle_ai_intent(
         routine = crud.get_routine(db, user.id)
         now = _now_local_naive()
         day = resolve_date_ru(original_text, now) or now.date()
-        ensure_day_anchors(db, user.id, day, routine)
-        tasks = crud.list_tasks_for_day(db, user.id, day)
-        scheduled = [t for t in tasks if t.planned_start and not t.is_done]
-        backlog = [t for t in tasks if t.planned_start is None and not t.is_done and t.task_type == "user"]
+        await run_db(ensure_day_anchors, db, user.id, day, routine)
+        forget_busy(context, user.id, day)
+        scheduled, backlog = crud.get_plan_buckets(db, user.id, day)
         _remember_plan_context(context, day, scheduled, backlog)
         await update.message.reply_text(_render_day_plan(scheduled, backlog, day, routine, locale=locale))
         return True
@@ -857,9 +865,9 @@ async def _handle_ai_intent(
             await _prompt_task_selection(name, update, context, db, user, routine)
             return True
         if name in {"delete", "done", "unschedule"}:
-            ids = _extract_task_ids(" ".join(str(a) for a in args))
+            ids = _extract_task_ids_from_args([str(a) for a in args])
             if ids:
-                await _apply_task_actions(name, ids, update, db, user)
+                await _apply_task_actions(name, ids, update, db, user, context)
                 return True
         return await _run_command_with_throttle(name, [str(a) for a in args], update, context, user)
 
@@ -919,9 +927,9 @@ async def _process_user_text(
             await _prompt_task_selection(name, update, context, db, user, routine)
             return
         if name in {"delete", "done", "unschedule"}:
-            ids = _extract_task_ids(" ".join(args))
+            ids = _extract_task_ids_from_args(args)
             if ids:
-                await _apply_task_actions(name, ids, update, db, user)
+                await _apply_task_actions(name, ids, update, db, user, context)
                 return
         handled = await _run_command_with_throttle(name, args, update, context, user)
         if handled:
@@ -942,6 +950,7 @@ async def _process_user_text(
             await update.message.reply_text(t("delete_by_date.invalid", locale=locale))
             return
         count = crud.delete_tasks_by_dates(db, user.id, dates)
+        forget_busy(context, user.id, *dates)
         dates_text = _format_date_list(dates)
         await update.message.reply_text(
             t("delete_by_date.done", locale=locale, dates=dates_text, count=count)
@@ -973,7 +982,7 @@ async def _process_user_text(
     if any(word in lower for word in ["удали", "удалить", "delete", "стереть", "убери задачу"]):
         ids = _extract_task_ids(text)
         if ids:
-            await _apply_task_actions("delete", ids, update, db, user)
+            await _apply_task_actions("delete", ids, update, db, user, context)
         else:
             raw_day = context.user_data.get("last_plan_day") if context else None
             day = None
@@ -984,18 +993,15 @@ async def _process_user_text(
                     day = None
             if day is None:
                 day = _now_local_naive().date()
-            tasks = crud.list_tasks_for_day(db, user.id, day)
+            tasks = _cached_list_tasks(context, db, user.id, day)
             query = _normalize_action_text(text)
             matches = _match_tasks_by_title([t for t in tasks if not t.is_done], query)
             if len(matches) == 1:
-                await _apply_task_actions("delete", [matches[0].id], update, db, user)
+                await _apply_task_actions("delete", [matches[0].id], update, db, user, context)
             elif matches:
-                context.user_data["pending_action"] = {
-                    "action": "delete",
-                    "candidate_ids": [t.id for t in matches],
-                }
+                context.user_data["pending_action"] = PendingAction("delete", frozenset(t.id for t in matches))
                 lines = [t("tasks.selection.header", locale=locale)]
-                lines.extend([_format_task_choice(t, routine, locale) for t in matches])
+                lines.extend(_format_task_choices(matches, routine, locale))
                 lines.append(t("tasks.selection.hint", locale=locale))
                 await update.message.reply_text("\n".join(lines))
             else:
@@ -1005,11 +1011,11 @@ async def _process_user_text(
     if any(word in lower for word in ["сделано", "готово", "закрыть", "завершить", "выполнено", "выполненной", "done"]):
         ids = _extract_task_ids(text)
         if ids:
-            await _apply_task_actions("done", ids, update, db, user)
+            await _apply_task_actions("done", ids, update, db, user, context)
         else:
-            candidates = _resolve_done_candidate(db, user, routine, _now_local_naive())
+            candidates = _resolve_done_candidate(db, user, routine, _now_local_naive(), context)
             if candidates:
-                await _apply_task_actions("done", [t.id for t in candidates], update, db, user)
+                await _apply_task_actions("done", [t.id for t in candidates], update, db, user, context)
             else:
                 await _prompt_task_selection("done", update, context, db, user, routine)
         return
@@ -1017,7 +1023,7 @@ async def _process_user_text(
     if any(word in lower for word in ["убери из расписания", "сними с плана", "перенеси в бэклог", "unschedule"]):
         ids = _extract_task_ids(text)
         if ids:
-            await _apply_task_actions("unschedule", ids, update, db, user)
+            await _apply_task_actions("unschedule", ids, update, db, user, context)
         else:
             await _prompt_task_selection("unschedule", update, context, db, user, routine)
         return
@@ -1040,6 +1046,8 @@ async def _process_user_text(
         if not task:
             await update.message.reply_text(t("tasks.reschedule.not_found", locale=locale, task_id=task_id))
             return
+        # The task's previous day is not known here, so every cached day is dropped.
+        forget_busy(context, user.id)
         await update.message.reply_text(
             t(
                 "tasks.reschedule.success",
@@ -1063,10 +1071,9 @@ async def _process_user_text(
         try:
             now = _now_local_naive()
             day = resolve_date_ru(text, now) or now.date()
-            ensure_day_anchors(db, user.id, day, routine)
-            tasks = crud.list_tasks_for_day(db, user.id, day)
-            scheduled = [t for t in tasks if t.planned_start and not t.is_done]
-            backlog = [t for t in tasks if t.planned_start is None and not t.is_done and t.task_type == "user"]
+            await run_db(ensure_day_anchors, db, user.id, day, routine)
+            forget_busy(context, user.id, day)
+            scheduled, backlog = crud.get_plan_buckets(db, user.id, day)
             _remember_plan_context(context, day, scheduled, backlog)
             await update.message.reply_text(_render_day_plan(scheduled, backlog, day, routine, locale=locale))
         finally:
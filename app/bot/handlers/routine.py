@@ -1,21 +1,25 @@
 from __future__ import annotations
 
 import datetime as dt
+from dataclasses import dataclass
+from typing import Any, Callable
 
 from telegram import Update
 from telegram.ext import ContextTypes
 
 from app import crud
-from app.bot.context import get_db_session, get_ready_user, get_user
+from app.bot.context import forget_busy, get_db_session, get_ready_user, get_user, run_db
 from app.bot.parsing.commands import parse_yes_no
 from app.bot.parsing.ru_reply import parse_reply
 from app.bot.parsing.text import is_skip, split_items
+from app.bot.parsing.time import _parse_time_range, _parse_time_value
 from app.bot.parsing.values import parse_int_value
 from app.bot.utils import now_local_naive
 from app.bot.rendering.keyboard import yes_no_keyboard, yes_no_cancel_keyboard
 from app.i18n.core import locale_for_user, t, t_list
 from app.services.autoplan import ensure_day_anchors
 from app.services.ai_intent import suggest_routine_steps
+from app.settings import settings
 
 
 async def start_onboarding(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -32,6 +36,126 @@ def _suggest_routine_steps(goal: str) -> list[str]:
         return ["Стакан воды", "Проверка семейного расписания", "Завтрак", "Сборы", "Быстрая уборка"]
     return ["Стакан воды", "Растяжка", "Завтрак", "План дня"]
 
+
+def _parse_hhmm_value(text: str) -> str | None:
+    value = _parse_time_value(text)
+    if not value:
+        return None
+    return f"{value.hour:02d}:{value.minute:02d}"
+
+
+def _parse_minutes_at_least(floor: int) -> Callable[[str], int | None]:
+    def _parse(text: str) -> int | None:
+        minutes = parse_int_value(text)
+        if minutes is None:
+            return None
+        return max(floor, minutes)
+
+    return _parse
+
+
+def _set_meal_window_range(routine, meal: str, start: dt.time, end: dt.time) -> None:
+    setattr(routine, f"{meal}_window_start", start.strftime("%H:%M"))
+    setattr(routine, f"{meal}_window_end", end.strftime("%H:%M"))
+
+
+def _set_meal_window(routine, meal: str, start: dt.time) -> None:
+    duration = dt.timedelta(minutes=int(routine.meal_duration_min or 45))
+    end = (dt.datetime.combine(dt.date.today(), start) + duration).time()
+    if end <= start:
+        end = dt.time(23, 59)
+    _set_meal_window_range(routine, meal, start, end)
+
+
+@dataclass(frozen=True)
+class _SimpleStep:
+    """Onboarding step of the shape: parse -> set routine field -> commit -> advance."""
+
+    parser: Callable[[str], Any]
+    attr: str
+    next_step: str
+    error_key: str
+    prompt_key: str
+    skip_prompt_key: str | None = None
+    yes_no_prompt: bool = False
+
+
+_SIMPLE_STEPS: dict[str, _SimpleStep] = {
+    "wake": _SimpleStep(
+        _parse_hhmm_value,
+        "sleep_target_wakeup",
+        "bed",
+        "onboarding.time_invalid",
+        "onboarding.ask_bed_thanks",
+        skip_prompt_key="onboarding.ask_bed",
+    ),
+    "bed": _SimpleStep(
+        _parse_hhmm_value,
+        "sleep_target_bedtime",
+        "workday",
+        "onboarding.time_invalid_bed",
+        "onboarding.ask_workday",
+    ),
+    "latest_end": _SimpleStep(
+        _parse_hhmm_value,
+        "latest_task_end",
+        "task_buffer",
+        "onboarding.latest_end_invalid",
+        "onboarding.ask_task_buffer",
+    ),
+    "task_buffer": _SimpleStep(
+        _parse_minutes_at_least(0),
+        "task_buffer_after_min",
+        "lunch",
+        "onboarding.task_buffer_invalid",
+        "onboarding.ask_lunch",
+    ),
+    "workout_block": _SimpleStep(
+        _parse_minutes_at_least(30),
+        "workout_block_min",
+        "workout_travel",
+        "onboarding.workout_block_invalid",
+        "onboarding.ask_workout_travel",
+    ),
+    "workout_travel": _SimpleStep(
+        _parse_minutes_at_least(0),
+        "workout_travel_oneway_min",
+        "workout_sunday",
+        "onboarding.workout_travel_invalid",
+        "onboarding.ask_workout_sunday",
+        yes_no_prompt=True,
+    ),
+}
+
+
+async def _handle_simple_step(
+    spec: _SimpleStep,
+    text: str,
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    db,
+    routine,
+    locale: str,
+) -> bool:
+    prompt_key = spec.prompt_key
+    if is_skip(text):
+        prompt_key = spec.skip_prompt_key or prompt_key
+    else:
+        value = spec.parser(text)
+        if value is None:
+            await update.message.reply_text(t(spec.error_key, locale=locale))
+            return True
+        setattr(routine, spec.attr, value)
+        db.add(routine)
+        db.commit()
+    context.user_data["onboarding_step"] = spec.next_step
+    if spec.yes_no_prompt:
+        await update.message.reply_text(t(prompt_key, locale=locale), reply_markup=yes_no_keyboard(locale))
+    else:
+        await update.message.reply_text(t(prompt_key, locale=locale))
+    return True
+
+
 async def handle_onboarding_text(
     text: str,
     update: Update,
@@ -50,6 +174,10 @@ async def handle_onboarding_text(
     routine = crud.get_routine(db, user.id)
     locale = locale_for_user(user)
 
+    spec = _SIMPLE_STEPS.get(step)
+    if spec is not None:
+        return await _handle_simple_step(spec, text, update, context, db, routine, locale)
+
     if step == "name":
         if is_skip(text):
             user.full_name = None
@@ -70,40 +198,6 @@ async def handle_onboarding_text(
         await update.message.reply_text(t("onboarding.ask_wake", locale=locale))
         return True
 
-    if step == "wake":
-        if is_skip(text):
-            context.user_data["onboarding_step"] = "bed"
-            await update.message.reply_text(t("onboarding.ask_bed", locale=locale))
-            return True
-        t = _parse_time_value(text) or None
-        if not t:
-            await update.message.reply_text(t("onboarding.time_invalid", locale=locale))
-            return True
-        wake_str = f"{t.hour:02d}:{t.minute:02d}"
-        _apply_wake_time(routine, wake_str)
-        db.add(routine)
-        db.commit()
-        context.user_data["onboarding_step"] = "bed"
-        await update.message.reply_text(t("onboarding.ask_bed_thanks", locale=locale))
-        return True
-
-    if step == "bed":
-        if is_skip(text):
-            context.user_data["onboarding_step"] = "workday"
-            await update.message.reply_text(t("onboarding.ask_workday", locale=locale))
-            return True
-        t = _parse_time_value(text) or None
-        if not t:
-            await update.message.reply_text(t("onboarding.time_invalid_bed", locale=locale))
-            return True
-        bed_str = f"{t.hour:02d}:{t.minute:02d}"
-        routine.sleep_target_bedtime = bed_str
-        db.add(routine)
-        db.commit()
-        context.user_data["onboarding_step"] = "workday"
-        await update.message.reply_text(t("onboarding.ask_workday", locale=locale))
-        return True
-
     if step == "workday":
         if not is_skip(text):
             time_range = _parse_time_range(text)
@@ -119,43 +213,17 @@ async def handle_onboarding_text(
         await update.message.reply_text(t("onboarding.ask_latest_end", locale=locale))
         return True
 
-    if step == "latest_end":
-        if not is_skip(text):
-            t = _parse_time_value(text) or None
-            if not t:
-                await update.message.reply_text(t("onboarding.latest_end_invalid", locale=locale))
-                return True
-            routine.latest_task_end = f"{t.hour:02d}:{t.minute:02d}"
-            db.add(routine)
-            db.commit()
-        context.user_data["onboarding_step"] = "task_buffer"
-        await update.message.reply_text(t("onboarding.ask_task_buffer", locale=locale))
-        return True
-
-    if step == "task_buffer":
-        if not is_skip(text):
-            minutes = parse_int_value(text)
-            if minutes is None:
-                await update.message.reply_text(t("onboarding.task_buffer_invalid", locale=locale))
-                return True
-            routine.task_buffer_after_min = max(0, minutes)
-            db.add(routine)
-            db.commit()
-        context.user_data["onboarding_step"] = "lunch"
-        await update.message.reply_text(t("onboarding.ask_lunch", locale=locale))
-        return True
-
     if step == "lunch":
         if not is_skip(text):
             time_range = _parse_time_range(text)
             if time_range:
                 _set_meal_window_range(routine, "lunch", time_range[0], time_range[1])
             else:
-                t = _parse_time_value(text) or None
-                if not t:
+                value = _parse_time_value(text)
+                if not value:
                     await update.message.reply_text(t("onboarding.lunch_invalid", locale=locale))
                     return True
-                _set_meal_window(routine, "lunch", t)
+                _set_meal_window(routine, "lunch", value)
             db.add(routine)
             db.commit()
         context.user_data["onboarding_step"] = "dinner"
@@ -168,11 +236,11 @@ async def handle_onboarding_text(
             if time_range:
                 _set_meal_window_range(routine, "dinner", time_range[0], time_range[1])
             else:
-                t = _parse_time_value(text) or None
-                if not t:
+                value = _parse_time_value(text)
+                if not value:
                     await update.message.reply_text(t("onboarding.dinner_invalid", locale=locale))
                     return True
-                _set_meal_window(routine, "dinner", t)
+                _set_meal_window(routine, "dinner", value)
             db.add(routine)
             db.commit()
         context.user_data["onboarding_step"] = "workout_enabled"
@@ -204,35 +272,6 @@ async def handle_onboarding_text(
         await update.message.reply_text(t("onboarding.ask_workout_block", locale=locale))
         return True
 
-    if step == "workout_block":
-        if not is_skip(text):
-            minutes = parse_int_value(text)
-            if minutes is None:
-                await update.message.reply_text(t("onboarding.workout_block_invalid", locale=locale))
-                return True
-            routine.workout_block_min = max(30, minutes)
-            db.add(routine)
-            db.commit()
-        context.user_data["onboarding_step"] = "workout_travel"
-        await update.message.reply_text(t("onboarding.ask_workout_travel", locale=locale))
-        return True
-
-    if step == "workout_travel":
-        if not is_skip(text):
-            minutes = parse_int_value(text)
-            if minutes is None:
-                await update.message.reply_text(t("onboarding.workout_travel_invalid", locale=locale))
-                return True
-            routine.workout_travel_oneway_min = max(0, minutes)
-            db.add(routine)
-            db.commit()
-        context.user_data["onboarding_step"] = "workout_sunday"
-        await update.message.reply_text(
-            t("onboarding.ask_workout_sunday", locale=locale),
-            reply_markup=yes_no_keyboard(locale),
-        )
-        return True
-
     if step == "workout_sunday":
         if not is_skip(text):
             yes = parse_yes_no(text)
@@ -326,7 +365,8 @@ async def cmd_morning(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
             return
         locale = locale_for_user(user)
         routine = crud.get_routine(db, user.id)
-        ensure_day_anchors(db, user.id, day, routine)
+        await run_db(ensure_day_anchors, db, user.id, day, routine)
+        forget_busy(context, user.id, day)
 
         tasks = crud.list_tasks_for_day(db, user.id, day)
         routine_tasks = [t for t in tasks if t.task_type == "system" and (t.idempotency_key or "").startswith("routine:")]
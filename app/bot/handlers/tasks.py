@@ -2,16 +2,25 @@ from __future__ import annotations
 
 import datetime as dt
 import re
-from collections import defaultdict
-from typing import Optional
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Iterator, Optional
 
 from telegram import Update
 from telegram.ext import ContextTypes
 
 from app import crud
-from app.bot.context import get_db_session, get_ready_user
+from app.bot.context import (
+    cached_busy,
+    forget_busy,
+    get_db_session,
+    get_ready_user,
+    run_db,
+    store_busy,
+)
+from app.bot.parsing.commands import BadArgs, parse_task_args
 from app.bot.parsing.ru_reply import parse_reply
-from app.bot.parsing.text import extract_task_ids, is_no_due
+from app.bot.parsing.text import extract_task_ids, extract_task_ids_from_args, is_no_due
 from app.bot.parsing.time import (
     _extract_task_timing,
     _has_due_intent,
@@ -21,13 +30,14 @@ from app.bot.parsing.time import (
 )
 from app.bot.parsing.tasks import normalize_task_title, shorten_title
 from app.bot.parsing.values import parse_int_value
-from app.bot.rendering.tasks import conflict_prompt, render_day_plan, schedule_offer
+from app.bot.rendering.tasks import CONFLICT_PREVIEW, conflict_prompt, render_day_plan, schedule_offer
 from app.bot.rendering.keyboard import yes_no_keyboard, yes_no_cancel_keyboard
-from app.bot.utils import now_local_naive
+from app.bot.utils import default_day_for_task, now_local_naive
 from app.bot.handlers.routine import start_onboarding
-from app.i18n.core import locale_for_user, t
+from app.i18n.core import locale_for_user, t, template
 from app.schemas.tasks import TaskCreate
 from app.services.autoplan import autoplan_days, ensure_day_anchors
+from app.services.interval_index import DayIntervalIndex
 from app.services.quick_capture import parse_quick_task
 from app.services.slots import (
     Interval,
@@ -35,9 +45,10 @@ from app.services.slots import (
     day_bounds,
     format_gap_options,
     gaps_from_busy,
+    merge_intervals,
     normalize_date_str,
-    parse_hhmm,
     task_display_minutes,
+    task_padding,
 )
 from app.settings import settings
 
@@ -47,73 +58,225 @@ def _idempotency_key(update: Update) -> Optional[str]:
         return None
     return f"tg:{update.effective_chat.id}:{update.message.message_id}"
 
-def _format_date_list(dates: list[dt.date]) -> str:
-    return ", ".join(sorted({d.isoformat() for d in dates}))
 
-def _format_task_choice(task, routine, locale: str) -> str:
-    if task.planned_start:
-        when = task.planned_start.strftime("%H:%M")
-    elif task.due_at:
-        when = task.due_at.strftime("%Y-%m-%d %H:%M")
-    else:
-        when = t("tasks.choice.no_time", locale=locale)
-    mins = task_display_minutes(task, routine)
-    return t(
-        "tasks.choice.line",
-        locale=locale,
-        task_id=task.id,
-        title=task.title,
-        when=when,
-        minutes=mins,
+# Pending dialog state kept in context.user_data between messages.
+@dataclass(frozen=True, slots=True)
+class PendingSchedule:
+    task_id: int
+    start: dt.datetime
+    end: dt.datetime
+    day: dt.date
+
+
+@dataclass(frozen=True, slots=True)
+class PendingAction:
+    action: str
+    candidate_ids: frozenset[int]
+
+
+@dataclass(frozen=True, slots=True)
+class PendingConflict:
+    title: str
+    start: dt.datetime
+    end: dt.datetime
+    estimate: int
+    idempotency_key: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class PendingTask:
+    step: str
+    title: str
+    estimate: int
+    date: dt.date | None = None
+
+
+_PAYLOAD_DEFAULTS = {"notes": None, "priority": 2, "kind": None}
+
+def _task_payload(
+    title: str,
+    estimate: int,
+    start: dt.datetime | None = None,
+    end: dt.datetime | None = None,
+    *,
+    due_at: dt.datetime | None = None,
+    idempotency_key: str | None = None,
+) -> TaskCreate:
+    """Build a TaskCreate, skipping pydantic validation when the values are already in range."""
+    fields = dict(
+        _PAYLOAD_DEFAULTS,
+        title=title,
+        estimate_minutes=estimate,
+        planned_start=start,
+        planned_end=end,
+        due_at=due_at,
+        idempotency_key=idempotency_key,
     )
+    if (
+        0 < len(title) <= 300
+        and title == title.strip()
+        and 0 < estimate <= 24 * 60
+        and (start is None or end is None or end > start)
+        and (idempotency_key is None or len(idempotency_key) <= 120)
+    ):
+        return TaskCreate.model_construct(**fields)
+    # Anything unusual goes through the full model so errors surface as before.
+    return TaskCreate(**fields)
+
+def _format_date_list(dates: list[dt.date]) -> str:
+    return ", ".join(d.isoformat() for d in sorted(set(dates)))
+
+def _format_task_choices(tasks, routine, locale: str) -> list[str]:
+    """Selection lines; the catalog strings are looked up once for the whole list."""
+    line = template("tasks.choice.line", locale)
+    no_time = t("tasks.choice.no_time", locale=locale)
+    lines = []
+    for task in tasks:
+        if task.planned_start:
+            when = task.planned_start.strftime("%H:%M")
+        elif task.due_at:
+            when = task.due_at.strftime("%Y-%m-%d %H:%M")
+        else:
+            when = no_time
+        lines.append(
+            line.format(task_id=task.id, title=task.title, when=when, minutes=task_display_minutes(task, routine))
+        )
+    return lines
 
 
-def _list_open_tasks(db, user, day: dt.date):
-    tasks = crud.list_tasks_for_day(db, user.id, day)
+def _list_open_tasks(db, user, day: dt.date, context=None):
+    tasks = _cached_list_tasks(context, db, user.id, day)
     return [t for t in tasks if not t.is_done]
 
-def _find_conflicts(db, user_id: int, start: dt.datetime, end: dt.datetime) -> list:
-    day = start.date()
-    tasks = crud.list_tasks_for_day(db, user_id, day)
-    conflicts = []
-    for task in tasks:
-        if not task.planned_start or not task.planned_end:
+def _request_cache(context, db, name: str) -> dict:
+    """Per-update cache kept in db.info, so it is released together with the session."""
+    if context is None:
+        return {}
+    return db.info.setdefault(name, {})
+
+_DAY_CACHES = ("_day_task_cache", "_day_index_cache", "_day_scheduled_cache")
+
+def _drop_day_caches(db, user_id: int, day: dt.date | None = None) -> None:
+    """Drop this update's cached day data; day=None drops every day of the user."""
+    for name in _DAY_CACHES:
+        entries = db.info.get(name)
+        if entries is None:
             continue
-        if task.is_done:
+        if day is not None:
+            entries.pop((user_id, day), None)
             continue
-        if task.planned_start < end and task.planned_end > start:
-            conflicts.append(task)
-    return conflicts
+        for key in [k for k in entries if k[0] == user_id]:
+            del entries[key]
+
+def _invalidate_day(context, db, user_id: int, day: dt.date) -> None:
+    """Drop cached data of a day after a write to it."""
+    if context is None:
+        return
+    forget_busy(context, user_id, day)
+    _drop_day_caches(db, user_id, day)
+
+def _invalidate_task_day(context, db, user_id: int, task) -> None:
+    if task.planned_start is not None:
+        _invalidate_day(context, db, user_id, task.planned_start.date())
+    elif context is not None:
+        # Backlog tasks show up in every day's list but never in busy intervals.
+        _drop_day_caches(db, user_id)
+
+def _cached_list_tasks(context, db, user_id: int, day: dt.date) -> list:
+    cache = _request_cache(context, db, "_day_task_cache")
+    tasks = cache.get((user_id, day))
+    if tasks is None:
+        tasks = crud.list_tasks_for_day(db, user_id, day)
+        cache[(user_id, day)] = tasks
+    return tasks
+
+def _cached_open_scheduled(context, db, user_id: int, day: dt.date) -> list:
+    """Open tasks with a planned slot, in planned_start order (list_tasks_for_day already sorts).
+
+    Reuses the full day list when this update already loaded it; otherwise reads
+    slim read-only rows, which is all the overlap and gap checks need.
+    """
+    cache = _request_cache(context, db, "_day_scheduled_cache")
+    scheduled = cache.get((user_id, day))
+    if scheduled is None:
+        tasks = _request_cache(context, db, "_day_task_cache").get((user_id, day))
+        if tasks is None:
+            scheduled = crud.list_open_scheduled_slim(db, user_id, day)
+        else:
+            scheduled = [t for t in tasks if t.planned_start and t.planned_end and not t.is_done]
+        cache[(user_id, day)] = scheduled
+    return scheduled
+
+def _day_index(context, db, user_id: int, day: dt.date) -> DayIntervalIndex:
+    """Interval tree of the day's open slots, built once per session and released with it."""
+    cache = _request_cache(context, db, "_day_index_cache")
+    index = cache.get((user_id, day))
+    if index is None:
+        # Done tasks never block a slot, so they stay out of the tree.
+        index = DayIntervalIndex.from_tasks(_cached_open_scheduled(context, db, user_id, day))
+        cache[(user_id, day)] = index
+    return index
+
+def _find_conflicts(
+    db, user_id: int, start: dt.datetime, end: dt.datetime, context=None, limit: int | None = None
+) -> list:
+    """Open tasks overlapping [start, end); pass limit when only a preview is rendered."""
+    key = (user_id, start.date())
+    if key in _request_cache(context, db, "_day_index_cache") or key in _request_cache(
+        context, db, "_day_scheduled_cache"
+    ):
+        return _day_index(context, db, user_id, start.date()).query(start, end, limit)
+    # Nothing loaded for the day yet: let the database return just the overlaps.
+    return crud.find_overlapping_tasks(db, user_id, start, end, limit=limit)
+
+_CONFLICT_CHOICE_RE = re.compile(
+    r"(?P<replace>\b1\b|замени|заменить|replace)"
+    r"|(?P<move>\b2\b|перенеси|перенести|move)"
+    r"|(?P<shift>\b3\b|сдвинь|сдвинуть|вставь|вставить|shift|insert)",
+    re.IGNORECASE,
+)
+_CONFLICT_CHOICE_ORDER = ("replace", "move", "shift")
+
 def _parse_conflict_choice(text: str) -> str | None:
-    lower = text.strip().lower()
-    if re.search(r"\b1\b", lower) or any(word in lower for word in ["замени", "заменить", "replace"]):
-        return "replace"
-    if re.search(r"\b2\b", lower) or any(word in lower for word in ["перенеси", "перенести", "move"]):
-        return "move"
-    if re.search(r"\b3\b", lower) or any(word in lower for word in ["сдвинь", "сдвинуть", "вставь", "вставить", "shift", "insert"]):
-        return "shift"
+    found = {match.lastgroup for match in _CONFLICT_CHOICE_RE.finditer(text)}
+    for choice in _CONFLICT_CHOICE_ORDER:
+        if choice in found:
+            return choice
     flags = parse_reply(text)
     if flags.is_cancel or flags.is_no:
         return "cancel"
     return None
 
-def _find_next_gap_after(
+def _iter_free_slots(
     db,
     user_id: int,
-    day: dt.date,
+    first_day: dt.date,
     routine,
     duration: dt.timedelta,
     after: dt.datetime,
-) -> tuple[dt.datetime, dt.datetime] | None:
-    gaps, day_start, _ = _gaps_for_day(db, user_id, day, routine)
-    cursor = max(after, day_start)
-    for gap in gaps:
-        if gap.end <= cursor:
+    days: int,
+    context=None,
+    now: dt.datetime | None = None,
+) -> Iterator[tuple[dt.date, dt.datetime, dt.datetime]]:
+    """Yield (day, start, end) slots of `duration` at or after `after`, walking up to `days` days.
+
+    Days are computed lazily, so a caller taking the first slot never loads the
+    days after it.
+    """
+    now = now or now_local_naive()
+    for offset in range(days):
+        day = first_day + dt.timedelta(days=offset)
+        day_start, day_end, _morn_s, _morn_e = day_bounds(day, routine, now=now)
+        cursor = max(after, day_start)
+        if day_end - cursor < duration:
+            # The rest of the day is too short: skip anchor placement and the day query.
             continue
-        start = max(gap.start, cursor)
-        if start + duration <= gap.end:
-            return start, start + duration
-    return None
+        gaps = _gaps_for_day(db, user_id, day, routine, context, now=now)
+        # Gaps are sorted and disjoint: jump straight to the first one ending after the cursor.
+        for gap in gaps[bisect_right(gaps, cursor, key=lambda gap: gap.end) :]:
+            start = max(gap.start, cursor)
+            if start + duration <= gap.end:
+                yield day, start, start + duration
 
 def _plan_shifted_tasks(
     db,
@@ -122,41 +285,44 @@ def _plan_shifted_tasks(
     routine,
     start: dt.datetime,
     end: dt.datetime,
+    context=None,
+    now: dt.datetime | None = None,
 ) -> tuple[list[tuple[object, dt.datetime, dt.datetime]], str | None]:
-    tasks = crud.list_tasks_for_day(db, user_id, day)
-    scheduled = [t for t in tasks if t.planned_start and t.planned_end and not t.is_done]
-    fixed = [t for t in scheduled if t.task_type != "user" or t.planned_end <= start]
-    blockers = [t for t in fixed if t.planned_start < end and t.planned_end > start]
+    index = _day_index(context, db, user_id, day)
+    blockers = [t for t in index.query(start, end) if t.task_type != "user" or t.planned_end <= start]
     if blockers:
         return [], "blocked"
 
-    movable = [t for t in scheduled if t.task_type == "user" and t.planned_end > start]
-    movable.sort(key=lambda t: t.planned_start)
+    fixed = []
+    movable = []
+    for task in _cached_open_scheduled(context, db, user_id, day):
+        if task.task_type == "user" and task.planned_end > start:
+            movable.append(task)
+        else:
+            fixed.append(task)
 
-    now = now_local_naive()
+    now = now or now_local_naive()
     day_start, day_end, _morn_s, _morn_e = day_bounds(day, routine, now=now)
-    busy = build_busy_intervals(fixed, routine)
-    busy.append(Interval(start, end))
+    # Placed tasks always end at the cursor, so only the fixed load ahead of it
+    # matters: sweep the merged busy list once instead of rebuilding gaps per task.
+    busy = merge_intervals(build_busy_intervals(fixed, routine) + [Interval(start, end)])
+    busy_ends = [iv.end for iv in busy]
     buffer_after = dt.timedelta(minutes=int(getattr(routine, "task_buffer_after_min", 0) or 0))
 
     moved: list[tuple[object, dt.datetime, dt.datetime]] = []
     cursor = end
+    idx = 0
     for task in movable:
         duration = task.planned_end - task.planned_start
-        gaps = gaps_from_busy(busy, day_start, day_end)
-        slot = None
-        for gap in gaps:
-            if gap.end <= cursor:
-                continue
-            candidate = max(gap.start, cursor, task.planned_start)
-            if candidate + duration <= gap.end:
-                slot = (candidate, candidate + duration)
-                break
-        if not slot:
+        candidate = max(day_start, cursor, task.planned_start)
+        idx = bisect_right(busy_ends, candidate, lo=idx)
+        while idx < len(busy) and busy[idx].start < candidate + duration:
+            candidate = busy[idx].end
+            idx += 1
+        if candidate + duration > day_end:
             return [], "no_space"
-        new_start, new_end = slot
+        new_start, new_end = candidate, candidate + duration
         moved.append((task, new_start, new_end))
-        busy.append(Interval(new_start, new_end + buffer_after))
         cursor = new_end + buffer_after
 
     if moved and cursor > day_end:
@@ -164,18 +330,20 @@ def _plan_shifted_tasks(
 
     return moved, None
 
-def _suggest_slot_for_task(db, user_id: int, routine, task) -> tuple[dt.date, dt.datetime, dt.datetime] | None:
-    now = now_local_naive()
+def _suggest_slot_for_task(
+    db,
+    user_id: int,
+    routine,
+    task,
+    context=None,
+    now: dt.datetime | None = None,
+) -> tuple[dt.date, dt.datetime, dt.datetime] | None:
+    now = now or now_local_naive()
     duration = dt.timedelta(minutes=task_display_minutes(task, routine))
-    for offset in range(0, 3):
-        day = now.date() + dt.timedelta(days=offset)
-        gaps, _, _ = _gaps_for_day(db, user_id, day, routine)
-        for gap in gaps:
-            if gap.end - gap.start >= duration:
-                start = gap.start
-                end = start + duration
-                return day, start, end
-    return None
+    # Midnight never beats a day's start, so each day is searched from its own window start.
+    after = dt.datetime.combine(now.date(), dt.time.min)
+    slots = _iter_free_slots(db, user_id, now.date(), routine, duration, after, 3, context, now=now)
+    return next(slots, None)
 
 async def _offer_schedule(
     task,
@@ -184,75 +352,89 @@ async def _offer_schedule(
     db,
     user,
     routine,
+    now: dt.datetime | None = None,
+    locale: str | None = None,
 ) -> None:
-    locale = locale_for_user(user)
-    suggestion = _suggest_slot_for_task(db, user.id, routine, task)
+    locale = locale or locale_for_user(user)
+    suggestion = _suggest_slot_for_task(db, user.id, routine, task, context, now=now)
     if not suggestion:
         await update.message.reply_text(t("tasks.schedule.none", locale=locale))
         return
     day, start, end = suggestion
-    context.user_data["pending_schedule"] = {
-        "task_id": task.id,
-        "start": start,
-        "end": end,
-        "day": day,
-    }
+    context.user_data["pending_schedule"] = PendingSchedule(task.id, start, end, day)
     await update.message.reply_text(
         schedule_offer(day, start, end, locale=locale),
         reply_markup=yes_no_keyboard(locale),
     )
 
-async def _apply_task_actions(action: str, task_ids: list[int], update: Update, db, user) -> bool:
+async def _apply_task_actions(action: str, task_ids: list[int], update: Update, db, user, context=None) -> bool:
     if not task_ids:
         return False
-    task_ids = list(dict.fromkeys(task_ids))
+    # Read up front: the bulk statements below commit and expire the user row.
+    user_id = user.id
+    locale = locale_for_user(user)
     deleted: list[int] = []
     done: list[int] = []
     unscheduled: list[int] = []
     skipped: list[int] = []
 
+    found = crud.get_tasks(db, user_id, task_ids)
+    # Ids arrive unique: extract_task_ids dedupes at parse time.
     for task_id in task_ids:
-        task = crud.get_task(db, user.id, task_id)
+        task = found.get(task_id)
         if not task:
             skipped.append(task_id)
             continue
         if action == "delete":
-            crud.delete_task(db, user.id, task_id)
             deleted.append(task_id)
-            continue
-        if action == "done":
-            crud.update_task_fields(db, user.id, task_id, is_done=True, schedule_source="manual")
+        elif action == "done":
             done.append(task_id)
-            continue
-        if action == "unschedule":
+        elif action == "unschedule":
             if task.task_type != "user":
                 skipped.append(task_id)
                 continue
-            crud.update_task_fields(db, user.id, task_id, planned_start=None, planned_end=None, schedule_source="manual")
             unscheduled.append(task_id)
-            continue
+    # Read before the bulk statements below commit and expire the rows.
+    touched_days = {
+        found[task_id].planned_start.date()
+        for task_id in deleted + done + unscheduled
+        if found[task_id].planned_start is not None
+    }
 
-    parts = []
-    locale = locale_for_user(user)
     if deleted:
-        parts.append(
-            t("tasks.action.deleted", locale=locale, ids=", ".join(str(i) for i in deleted))
-        )
-    if done:
-        parts.append(t("tasks.action.done", locale=locale, ids=", ".join(str(i) for i in done)))
-    if unscheduled:
-        parts.append(
-            t("tasks.action.unscheduled", locale=locale, ids=", ".join(str(i) for i in unscheduled))
+        crud.bulk_delete_tasks(db, user_id, deleted)
+    # Tasks already in the target state are reported but not rewritten.
+    to_finish = [task_id for task_id in done if not found[task_id].is_done]
+    if to_finish:
+        crud.bulk_set_task_fields(db, user_id, to_finish, is_done=True, schedule_source="manual")
+    to_clear = [
+        task_id
+        for task_id in unscheduled
+        if found[task_id].planned_start is not None or found[task_id].planned_end is not None
+    ]
+    if to_clear:
+        crud.bulk_set_task_fields(
+            db, user_id, to_clear, planned_start=None, planned_end=None, schedule_source="manual"
         )
-    if skipped:
-        parts.append(
-            t("tasks.action.skipped", locale=locale, ids=", ".join(str(i) for i in skipped))
+    if context is not None:
+        _drop_day_caches(db, user_id)
+        if touched_days:
+            forget_busy(context, user_id, *touched_days)
+
+    message = "\n".join(
+        t(key, locale=locale, ids=", ".join(map(str, ids)))
+        for key, ids in (
+            ("tasks.action.deleted", deleted),
+            ("tasks.action.done", done),
+            ("tasks.action.unscheduled", unscheduled),
+            ("tasks.action.skipped", skipped),
         )
-
-    if not parts:
+        if ids
+    )
+    if not message:
         await update.message.reply_text(t("tasks.action.none", locale=locale))
         return False
-    await update.message.reply_text("\n".join(parts))
+    await update.message.reply_text(message)
     return True
 
 async def _prompt_task_selection(action: str, update: Update, context: ContextTypes.DEFAULT_TYPE, db, user, routine) -> None:
@@ -265,20 +447,19 @@ async def _prompt_task_selection(action: str, update: Update, context: ContextTy
             day = None
     if day is None:
         day = now_local_naive().date()
-    tasks = _list_open_tasks(db, user, day)
+    tasks = _list_open_tasks(db, user, day, context)
     locale = locale_for_user(user)
     if not tasks:
         await update.message.reply_text(t("tasks.selection.empty", locale=locale))
         return
-    context.user_data["pending_action"] = {
-        "action": action,
-        "candidate_ids": [t.id for t in tasks],
-    }
+    context.user_data["pending_action"] = PendingAction(action, frozenset(t.id for t in tasks))
     lines = [t("tasks.selection.header", locale=locale)]
-    lines.extend([_format_task_choice(t, routine, locale) for t in tasks])
+    lines.extend(_format_task_choices(tasks, routine, locale))
     lines.append(t("tasks.selection.hint", locale=locale))
     await update.message.reply_text("\n".join(lines))
 
+_PLAN_WORDS_RE = re.compile(r"\b(план|расписание|график|бэклог|беклог|backlog)\b")
+
 async def _handle_pending_action(
     text: str,
     update: Update,
@@ -295,7 +476,7 @@ async def _handle_pending_action(
     if lower.startswith("/"):
         context.user_data.pop("pending_action", None)
         return False
-    if re.search(r"\b(план|расписание|график|бэклог|беклог|backlog)\b", lower):
+    if _PLAN_WORDS_RE.search(lower):
         context.user_data.pop("pending_action", None)
         return False
     flags = parse_reply(text)
@@ -305,17 +486,17 @@ async def _handle_pending_action(
         return True
     ids = extract_task_ids(text)
     if not ids:
-        if not re.search(r"\d", text):
+        if not any(ch.isdecimal() for ch in lower):
             context.user_data.pop("pending_action", None)
             return False
         await update.message.reply_text(t("tasks.selection.invalid", locale=locale))
         return True
-    candidate_ids = set(pending.get("candidate_ids") or [])
-    if candidate_ids and any(task_id not in candidate_ids for task_id in ids):
+    candidate_ids = pending.candidate_ids
+    if candidate_ids and not candidate_ids.issuperset(ids):
         await update.message.reply_text(t("tasks.selection.out_of_range", locale=locale))
         return True
     context.user_data.pop("pending_action", None)
-    return await _apply_task_actions(pending.get("action", ""), ids, update, db, user)
+    return await _apply_task_actions(pending.action, ids, update, db, user, context)
 
 async def _handle_pending_schedule(
     text: str,
@@ -348,13 +529,10 @@ async def _handle_pending_schedule(
     if not answer:
         await update.message.reply_text(t("tasks.schedule.declined", locale=locale))
         return True
-    task_id = pending.get("task_id")
-    start = pending.get("start")
-    end = pending.get("end")
-    if not task_id or not start or not end:
-        await update.message.reply_text(t("tasks.schedule.failed", locale=locale))
-        return True
+    task_id, start, end = pending.task_id, pending.start, pending.end
+    # The offer is made for a task just added to the backlog, so only the new day changes.
     crud.update_task_fields(db, user.id, task_id, planned_start=start, planned_end=end, schedule_source="assistant")
+    forget_busy(context, user.id, start.date())
     await update.message.reply_text(
         t(
             "tasks.schedule.success",
@@ -379,13 +557,50 @@ async def _prompt_conflict_resolution(
     locale: str,
 ) -> None:
     await update.message.reply_text(conflict_prompt(conflicts, locale=locale))
-    context.user_data["pending_conflict"] = {
-        "title": title,
-        "start": start,
-        "end": end,
-        "estimate": estimate,
-        "idempotency_key": idempotency_key,
-    }
+    context.user_data["pending_conflict"] = PendingConflict(
+        title or t("tasks.default_title", locale=locale), start, end, estimate, idempotency_key
+    )
+
+async def _finalize_scheduled(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    db,
+    user,
+    message_key: str,
+    *,
+    title: str,
+    estimate: int,
+    start: dt.datetime,
+    end: dt.datetime,
+    idempotency_key: str | None = None,
+    pending_key: str | None = None,
+    commit: bool = False,
+    **message_args,
+):
+    """Create a scheduled task, clear the pending state and send the confirmation."""
+    # Read before the commit below expires the user row.
+    user_id = user.id
+    locale = locale_for_user(user)
+    payload = _task_payload(title, estimate, start, end, idempotency_key=idempotency_key)
+    task = crud.create_task(db, user_id=user_id, data=payload)
+    if commit:
+        # Idempotent hits return without committing; flush the batched mutation too.
+        db.commit()
+    _invalidate_task_day(context, db, user_id, task)
+    if pending_key:
+        context.user_data.pop(pending_key, None)
+    await update.message.reply_text(
+        t(
+            message_key,
+            locale=locale,
+            task_id=task.id,
+            start=start.strftime("%H:%M"),
+            end=end.strftime("%H:%M"),
+            date=start.date().isoformat(),
+            **message_args,
+        ),
+    )
+    return task
 
 async def _handle_pending_conflict(
     text: str,
@@ -415,52 +630,33 @@ async def _handle_pending_conflict(
         await update.message.reply_text(t("tasks.conflict.cancelled", locale=locale))
         return True
 
-    start = pending.get("start")
-    end = pending.get("end")
-    title = pending.get("title") or t("tasks.default_title", locale=locale)
-    estimate = int(pending.get("estimate") or 30)
-    idempotency_key = pending.get("idempotency_key")
-    if not start or not end:
-        context.user_data.pop("pending_conflict", None)
-        await update.message.reply_text(t("tasks.conflict.missing_time", locale=locale))
-        return True
+    start, end, title = pending.start, pending.end, pending.title
+    estimate, idempotency_key = pending.estimate, pending.idempotency_key
 
     day = start.date()
     if choice == "replace":
-        conflicts = _find_conflicts(db, user.id, start, end)
+        conflicts = _find_conflicts(db, user.id, start, end, context)
         blocked = [t for t in conflicts if t.task_type != "user"]
         if blocked:
             await update.message.reply_text(t("tasks.conflict.blocked_replace", locale=locale))
             return True
-        deleted = []
-        for task in conflicts:
-            if task.task_type == "user":
-                crud.delete_task(db, user.id, task.id)
-                deleted.append(task.id)
-        payload = TaskCreate(
+        deleted = [task.id for task in conflicts if task.task_type == "user"]
+        crud.bulk_delete_tasks(db, user.id, deleted, commit=False)
+        _invalidate_day(context, db, user.id, day)
+        await _finalize_scheduled(
+            update,
+            context,
+            db,
+            user,
+            "tasks.conflict.replaced",
             title=title,
-            notes=None,
-            estimate_minutes=estimate,
-            planned_start=start,
-            planned_end=end,
-            due_at=None,
-            priority=2,
-            kind=None,
+            estimate=estimate,
+            start=start,
+            end=end,
             idempotency_key=idempotency_key,
-        )
-        task = crud.create_task(db, user_id=user.id, data=payload)
-        context.user_data.pop("pending_conflict", None)
-        deleted_text = ", ".join(str(i) for i in deleted) if deleted else ""
-        await update.message.reply_text(
-            t(
-                "tasks.conflict.replaced",
-                locale=locale,
-                deleted=deleted_text,
-                task_id=task.id,
-                start=start.strftime("%H:%M"),
-                end=end.strftime("%H:%M"),
-                date=day.isoformat(),
-            )
+            pending_key="pending_conflict",
+            commit=True,
+            deleted=", ".join(str(i) for i in deleted),
         )
         return True
 
@@ -478,14 +674,9 @@ async def _handle_pending_conflict(
         else:
             base_date = date_hint or day
             duration_td = dt.timedelta(minutes=estimate)
-            new_start = new_end = None
-            for offset in range(0, 3):
-                candidate_day = base_date + dt.timedelta(days=offset)
-                after = start if candidate_day == day and offset == 0 else dt.datetime.combine(candidate_day, dt.time.min)
-                slot = _find_next_gap_after(db, user.id, candidate_day, routine, duration_td, after)
-                if slot:
-                    new_start, new_end = slot
-                    break
+            after = start if base_date == day else dt.datetime.combine(base_date, dt.time.min)
+            slots = _iter_free_slots(db, user.id, base_date, routine, duration_td, after, 3, context, now=now)
+            _slot_day, new_start, new_end = next(slots, (None, None, None))
             if not new_start or not new_end:
                 await update.message.reply_text(t("tasks.conflict.no_slot", locale=locale))
                 return True
@@ -495,45 +686,31 @@ async def _handle_pending_conflict(
             await update.message.reply_text(t("tasks.conflict.invalid_range", locale=locale))
             return True
 
-        conflicts = _find_conflicts(db, user.id, new_start, new_end)
+        conflicts = _find_conflicts(db, user.id, new_start, new_end, context, limit=CONFLICT_PREVIEW)
         if conflicts:
-            context.user_data["pending_conflict"] = {
-                "title": title,
-                "start": new_start,
-                "end": new_end,
-                "estimate": duration_minutes,
-                "idempotency_key": idempotency_key,
-            }
+            context.user_data["pending_conflict"] = PendingConflict(
+                title, new_start, new_end, duration_minutes, idempotency_key
+            )
             await update.message.reply_text(conflict_prompt(conflicts, locale=locale))
             return True
 
-        payload = TaskCreate(
+        await _finalize_scheduled(
+            update,
+            context,
+            db,
+            user,
+            "tasks.conflict.moved",
             title=title,
-            notes=None,
-            estimate_minutes=duration_minutes,
-            planned_start=new_start,
-            planned_end=new_end,
-            due_at=None,
-            priority=2,
-            kind=None,
+            estimate=duration_minutes,
+            start=new_start,
+            end=new_end,
             idempotency_key=idempotency_key,
-        )
-        task = crud.create_task(db, user_id=user.id, data=payload)
-        context.user_data.pop("pending_conflict", None)
-        await update.message.reply_text(
-            t(
-                "tasks.conflict.moved",
-                locale=locale,
-                task_id=task.id,
-                start=new_start.strftime("%H:%M"),
-                end=new_end.strftime("%H:%M"),
-                date=new_start.date().isoformat(),
-            )
+            pending_key="pending_conflict",
         )
         return True
 
     if choice == "shift":
-        moved, err = _plan_shifted_tasks(db, user.id, day, routine, start, end)
+        moved, err = _plan_shifted_tasks(db, user.id, day, routine, start, end, context, now=now)
         if err == "blocked":
             await update.message.reply_text(t("tasks.conflict.blocked_shift", locale=locale))
             return True
@@ -541,39 +718,28 @@ async def _handle_pending_conflict(
             await update.message.reply_text(t("tasks.conflict.no_space", locale=locale))
             return True
 
-        for task, new_start, new_end in moved:
-            crud.update_task_fields(
-                db,
-                user.id,
-                task.id,
-                planned_start=new_start,
-                planned_end=new_end,
-                schedule_source="assistant",
-            )
-
-        payload = TaskCreate(
+        crud.bulk_update_planned(
+            db,
+            user.id,
+            [(task.id, new_start, new_end) for task, new_start, new_end in moved],
+            schedule_source="assistant",
+            commit=False,
+        )
+        _invalidate_day(context, db, user.id, day)
+        await _finalize_scheduled(
+            update,
+            context,
+            db,
+            user,
+            "tasks.conflict.shifted",
             title=title,
-            notes=None,
-            estimate_minutes=estimate,
-            planned_start=start,
-            planned_end=end,
-            due_at=None,
-            priority=2,
-            kind=None,
+            estimate=estimate,
+            start=start,
+            end=end,
             idempotency_key=idempotency_key,
-        )
-        task = crud.create_task(db, user_id=user.id, data=payload)
-        context.user_data.pop("pending_conflict", None)
-        await update.message.reply_text(
-            t(
-                "tasks.conflict.shifted",
-                locale=locale,
-                task_id=task.id,
-                start=start.strftime("%H:%M"),
-                end=end.strftime("%H:%M"),
-                date=day.isoformat(),
-                moved=len(moved),
-            )
+            pending_key="pending_conflict",
+            commit=True,
+            moved=len(moved),
         )
         return True
 
@@ -591,21 +757,12 @@ async def _handle_pending_task(
     if not pending:
         return False
     locale = locale_for_user(user)
-    step = pending.get("step")
+    step = pending.step
     if step == "time":
         if _is_no_due(text):
-            payload = TaskCreate(
-                title=pending.get("title") or t("tasks.default_title", locale=locale),
-                notes=None,
-                estimate_minutes=int(pending.get("estimate") or 30),
-                planned_start=None,
-                planned_end=None,
-                due_at=None,
-                priority=2,
-                kind=None,
-                idempotency_key=None,
-            )
+            payload = _task_payload(pending.title, pending.estimate)
             task = crud.create_task(db, user_id=user.id, data=payload)
+            _invalidate_task_day(context, db, user.id, task)
             context.user_data.pop("pending_task", None)
             await update.message.reply_text(
                 t("tasks.pending.backlog_added", locale=locale, task_id=task.id)
@@ -617,22 +774,22 @@ async def _handle_pending_task(
             await update.message.reply_text(t("tasks.pending.time_invalid", locale=locale))
             return True
 
-        date = pending.get("date")
-        if not isinstance(date, dt.date):
+        date = pending.date
+        if date is None:
             await update.message.reply_text(t("tasks.pending.date_missing", locale=locale))
             context.user_data.pop("pending_task", None)
             return True
 
         start = dt.datetime.combine(date, time_value)
-        duration = int(pending.get("estimate") or 30)
+        duration = pending.estimate
         end = start + dt.timedelta(minutes=duration)
-        conflicts = _find_conflicts(db, user.id, start, end)
+        conflicts = _find_conflicts(db, user.id, start, end, context, limit=CONFLICT_PREVIEW)
         if conflicts:
             await _prompt_conflict_resolution(
                 update,
                 context,
                 conflicts,
-                title=pending.get("title") or t("tasks.default_title", locale=locale),
+                title=pending.title,
                 start=start,
                 end=end,
                 estimate=duration,
@@ -641,28 +798,17 @@ async def _handle_pending_task(
             context.user_data.pop("pending_task", None)
             return True
 
-        payload = TaskCreate(
-            title=pending.get("title") or t("tasks.default_title", locale=locale),
-            notes=None,
-            estimate_minutes=duration,
-            planned_start=start,
-            planned_end=end,
-            due_at=None,
-            priority=2,
-            kind=None,
-            idempotency_key=None,
-        )
-        task = crud.create_task(db, user_id=user.id, data=payload)
-        context.user_data.pop("pending_task", None)
-        await update.message.reply_text(
-            t(
-                "tasks.pending.scheduled",
-                locale=locale,
-                task_id=task.id,
-                start=start.strftime("%H:%M"),
-                end=end.strftime("%H:%M"),
-                date=date.isoformat(),
-            )
+        await _finalize_scheduled(
+            update,
+            context,
+            db,
+            user,
+            "tasks.pending.scheduled",
+            title=pending.title,
+            estimate=duration,
+            start=start,
+            end=end,
+            pending_key="pending_task",
         )
         return True
 
@@ -673,10 +819,7 @@ async def _handle_pending_task(
     if _is_no_due(text):
         due_at = None
     else:
-        parsed = parse_quick_task(text, now)
-        due_at = parsed.due_at
-        if parsed.title and parsed.title != text:
-            pending["title"] = pending.get("title") or parsed.title
+        due_at = parse_quick_task(text, now).due_at
         if due_at is None:
             date, time_range, time_value, _ = _extract_task_timing(text, now)
             if date and time_range:
@@ -690,21 +833,12 @@ async def _handle_pending_task(
         await update.message.reply_text(t("tasks.pending.due_invalid", locale=locale))
         return True
 
-    payload = TaskCreate(
-        title=pending.get("title") or t("tasks.default_title", locale=locale),
-        notes=None,
-        estimate_minutes=int(pending.get("estimate") or 30),
-        planned_start=None,
-        planned_end=None,
-        due_at=due_at,
-        priority=2,
-        kind=None,
-        idempotency_key=None,
-    )
+    payload = _task_payload(pending.title, pending.estimate, due_at=due_at)
     task = crud.create_task(db, user_id=user.id, data=payload)
+    _invalidate_task_day(context, db, user.id, task)
     context.user_data.pop("pending_task", None)
     await update.message.reply_text(t("tasks.pending.created_searching", locale=locale))
-    await _offer_schedule(task, update, context, db, user, routine)
+    await _offer_schedule(task, update, context, db, user, routine, now=now, locale=locale)
     return True
 
 async def _handle_task_request(
@@ -730,7 +864,7 @@ async def _handle_task_request(
     if date and time_range:
         start = dt.datetime.combine(date, time_range[0])
         end = dt.datetime.combine(date, time_range[1])
-        conflicts = _find_conflicts(db, user.id, start, end)
+        conflicts = _find_conflicts(db, user.id, start, end, context, limit=CONFLICT_PREVIEW)
         if conflicts:
             await _prompt_conflict_resolution(
                 update,
@@ -745,34 +879,24 @@ async def _handle_task_request(
             )
             return True
 
-        payload = TaskCreate(
+        await _finalize_scheduled(
+            update,
+            context,
+            db,
+            user,
+            "tasks.request.scheduled",
             title=title,
-            notes=None,
-            estimate_minutes=estimate,
-            planned_start=start,
-            planned_end=end,
-            due_at=None,
-            priority=2,
-            kind=None,
+            estimate=estimate,
+            start=start,
+            end=end,
             idempotency_key=idempotency_key,
         )
-        task = crud.create_task(db, user_id=user.id, data=payload)
-        await update.message.reply_text(
-            t(
-                "tasks.request.scheduled",
-                locale=locale_for_user(user),
-                task_id=task.id,
-                start=start.strftime("%H:%M"),
-                end=end.strftime("%H:%M"),
-                date=date.isoformat(),
-            )
-        )
         return True
 
     if time_value:
         start = _resolve_date_for_time(now, date, time_value)
         end = start + dt.timedelta(minutes=estimate)
-        conflicts = _find_conflicts(db, user.id, start, end)
+        conflicts = _find_conflicts(db, user.id, start, end, context, limit=CONFLICT_PREVIEW)
         if conflicts:
             await _prompt_conflict_resolution(
                 update,
@@ -787,103 +911,85 @@ async def _handle_task_request(
             )
             return True
 
-        payload = TaskCreate(
+        await _finalize_scheduled(
+            update,
+            context,
+            db,
+            user,
+            "tasks.request.scheduled",
             title=title,
-            notes=None,
-            estimate_minutes=estimate,
-            planned_start=start,
-            planned_end=end,
-            due_at=None,
-            priority=2,
-            kind=None,
+            estimate=estimate,
+            start=start,
+            end=end,
             idempotency_key=idempotency_key,
         )
-        task = crud.create_task(db, user_id=user.id, data=payload)
-        await update.message.reply_text(
-            t(
-                "tasks.request.scheduled",
-                locale=locale_for_user(user),
-                task_id=task.id,
-                start=start.strftime("%H:%M"),
-                end=end.strftime("%H:%M"),
-                date=start.date().isoformat(),
-            )
-        )
         return True
 
     if date and not _has_due_intent(text):
-        context.user_data["pending_task"] = {
-            "step": "time",
-            "title": title,
-            "date": date,
-            "estimate": estimate,
-        }
-        await update.message.reply_text(
-            t("tasks.request.ask_time", locale=locale_for_user(user))
+        context.user_data["pending_task"] = PendingTask(
+            "time", title or t("tasks.default_title", locale=locale), estimate, date
         )
+        await update.message.reply_text(t("tasks.request.ask_time", locale=locale))
         return True
 
     if date and _has_due_intent(text):
         due_at = dt.datetime.combine(date, dt.time(18, 0))
-        payload = TaskCreate(
-            title=title,
-            notes=None,
-            estimate_minutes=estimate,
-            planned_start=None,
-            planned_end=None,
-            due_at=due_at,
-            priority=2,
-            kind=None,
-            idempotency_key=idempotency_key,
-        )
+        payload = _task_payload(title, estimate, due_at=due_at, idempotency_key=idempotency_key)
         task = crud.create_task(db, user_id=user.id, data=payload)
+        _invalidate_task_day(context, db, user.id, task)
         await update.message.reply_text(
             t(
                 "tasks.request.added_with_due",
-                locale=locale_for_user(user),
+                locale=locale,
                 title=task.title,
                 due_at=due_at.strftime("%Y-%m-%d %H:%M"),
             )
         )
-        await _offer_schedule(task, update, context, db, user, routine)
+        await _offer_schedule(task, update, context, db, user, routine, now=now, locale=locale)
         return True
 
-    payload = TaskCreate(
-        title=title,
-        notes=None,
-        estimate_minutes=estimate,
-        planned_start=None,
-        planned_end=None,
-        due_at=None,
-        priority=2,
-        kind=None,
-        idempotency_key=idempotency_key,
-    )
+    payload = _task_payload(title, estimate, idempotency_key=idempotency_key)
     task = crud.create_task(db, user_id=user.id, data=payload)
+    _invalidate_task_day(context, db, user.id, task)
     if parsed.checklist_items:
         crud.add_checklist_items(db, task.id, parsed.checklist_items)
     await update.message.reply_text(
         t(
             "tasks.request.backlog_added",
-            locale=locale_for_user(user),
+            locale=locale,
             title=task.title,
             task_id=task.id,
         )
     )
     return True
 
-def _gaps_for_day(db, user_id: int, day: dt.date, routine):
-    ensure_day_anchors(db, user_id, day, routine)
-
-    all_tasks = crud.list_tasks_for_day(db, user_id, day)
-    scheduled = [t for t in all_tasks if t.planned_start and not t.is_done]
-
-    now = now_local_naive()
+def _day_gaps(busy: list, day: dt.date, routine, now: dt.datetime | None = None):
+    now = now or now_local_naive()
     day_start, day_end, _morn_s, _morn_e = day_bounds(day, routine, now=now)
+    return gaps_from_busy(busy, day_start, day_end)
+
+def _cached_gaps(context, user_id: int, day: dt.date, routine, now: dt.datetime | None = None):
+    """Gaps from busy intervals cached by a recent update, or None when the DB is needed."""
+    busy = cached_busy(context, user_id, day, (routine.id, routine.updated_at))
+    return None if busy is None else _day_gaps(busy, day, routine, now)
+
+def _gaps_for_day(db, user_id: int, day: dt.date, routine, context=None, now: dt.datetime | None = None):
+    # Busy intervals do not depend on 'now', so a recent result is reused across
+    # the slots -> place flow and only the day window is recomputed.
+    gaps = _cached_gaps(context, user_id, day, routine, now)
+    if gaps is not None:
+        return gaps
+    ensure_day_anchors(db, user_id, day, routine)
+    # Anchors are keyed per user, so placing them for this day moves them off other
+    # days' task lists. Busy intervals of other days stay valid: their anchors are
+    # placed back the same way whenever those days are computed.
+    if context is not None:
+        _drop_day_caches(db, user_id)
 
+    scheduled = _cached_open_scheduled(context, db, user_id, day)
     busy = build_busy_intervals(scheduled, routine)
-    gaps = gaps_from_busy(busy, day_start, day_end)
-    return gaps, day_start, day_end
+    store_busy(context, user_id, day, (routine.id, routine.updated_at), busy)
+    return _day_gaps(busy, day, routine, now)
 
 async def cmd_todo(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if len(context.args) < 2:
@@ -901,26 +1007,15 @@ async def cmd_todo(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         await update.message.reply_text(t("tasks.todo.title_empty", locale="ru"))
         return
 
+    payload = _task_payload(title, estimate, idempotency_key=_idempotency_key(update))
     with get_db_session() as db:
         user = await get_ready_user(update, context, db, start_onboarding=start_onboarding)
         if not user:
             return
         locale = locale_for_user(user)
-        payload = TaskCreate(
-            title=title,
-            notes=None,
-            estimate_minutes=estimate,
-            planned_start=None,
-            planned_end=None,
-            due_at=None,
-            priority=2,
-            kind=None,
-            idempotency_key=_idempotency_key(update),
-        )
-        task = crud.create_task(db, user_id=user.id, data=payload)
-        await update.message.reply_text(
-            t("tasks.todo.created", locale=locale, task_id=task.id)
-        )
+        task_id = crud.create_task(db, user_id=user.id, data=payload).id
+
+    await update.message.reply_text(t("tasks.todo.created", locale=locale, task_id=task_id))
 
 async def cmd_capture(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if not context.args:
@@ -930,24 +1025,21 @@ async def cmd_capture(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
     text = " ".join(context.args).strip()
     now = now_local_naive()
     parsed = parse_quick_task(text, now)
+    payload = _task_payload(
+        parsed.title,
+        30,
+        due_at=parsed.due_at,
+        idempotency_key=_idempotency_key(update),
+    )
 
     with get_db_session() as db:
         user = await get_ready_user(update, context, db, start_onboarding=start_onboarding)
         if not user:
             return
         locale = locale_for_user(user)
-        payload = TaskCreate(
-            title=parsed.title,
-            notes=None,
-            estimate_minutes=30,
-            planned_start=None,
-            planned_end=None,
-            due_at=parsed.due_at,
-            priority=2,
-            kind=None,
-            idempotency_key=_idempotency_key(update),
-        )
         task = crud.create_task(db, user_id=user.id, data=payload)
+        # Read before the checklist commit expires the instance.
+        title = task.title
         if parsed.checklist_items:
             crud.add_checklist_items(db, task.id, parsed.checklist_items)
 
@@ -958,7 +1050,7 @@ async def cmd_capture(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         else ""
     )
     await update.message.reply_text(
-        t("tasks.capture.added", locale=locale, title=task.title, when=when, checklist=checklist_info)
+        t("tasks.capture.added", locale=locale, title=title, when=when, checklist=checklist_info)
     )
 
 
@@ -970,6 +1062,7 @@ async def cmd_call(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     text = " ".join(context.args).strip()
     now = now_local_naive()
     parsed = parse_quick_task(text, now)
+    idempotency_key = _idempotency_key(update)
 
     with get_db_session() as db:
         user = await get_ready_user(update, context, db, start_onboarding=start_onboarding)
@@ -992,7 +1085,7 @@ async def cmd_call(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
             estimate_minutes=15,
             task_type="user",
             schedule_source="assistant",
-            idempotency_key=_idempotency_key(update),
+            idempotency_key=idempotency_key,
         )
         crud.add_checklist_items(
             db,
@@ -1000,10 +1093,10 @@ async def cmd_call(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
             [t("suggestion.followup.checklist", locale=locale, name=name)],
         )
 
-        due_text = due_at.strftime("%Y-%m-%d %H:%M")
-        await update.message.reply_text(
-            t("call.created", locale=locale, task_id=task.id, due=due_text)
-        )
+        task_id = task.id
+
+    due_text = due_at.strftime("%Y-%m-%d %H:%M")
+    await update.message.reply_text(t("call.created", locale=locale, task_id=task_id, due=due_text))
 
 async def cmd_plan(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     date_arg = context.args[0] if context.args else None
@@ -1023,15 +1116,18 @@ async def cmd_plan(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         locale = locale_for_user(user)
         routine = crud.get_routine(db, user.id)
 
-        ensure_day_anchors(db, user.id, day, routine)
+        await run_db(ensure_day_anchors, db, user.id, day, routine)
+        # Anchors moved off other days' task lists; only this day's busy intervals changed.
+        _drop_day_caches(db, user.id)
+        forget_busy(context, user.id, day)
 
-        tasks = crud.list_tasks_for_day(db, user.id, day)
-        scheduled = [t for t in tasks if t.planned_start and not t.is_done]
-        backlog = [t for t in tasks if t.planned_start is None and not t.is_done and t.task_type == "user"]
+        scheduled, backlog = crud.get_plan_buckets(db, user.id, day)
         context.user_data["last_plan_day"] = day.isoformat()
         context.user_data["last_plan_task_ids"] = [t.id for t in scheduled] + [t.id for t in backlog]
+        # Render while the session can still refresh attributes expired by the anchor commits.
+        text = render_day_plan(scheduled, backlog, day, routine, locale=locale)
 
-        await update.message.reply_text(render_day_plan(scheduled, backlog, day, routine, locale=locale))
+    await update.message.reply_text(text)
 
 async def cmd_autoplan(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if not context.args:
@@ -1058,7 +1154,8 @@ async def cmd_autoplan(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
             return
         routine = crud.get_routine(db, user.id)
         locale = locale_for_user(user)
-        result = autoplan_days(db, user.id, routine, days=days, start_date=start_date)
+        result = await run_db(autoplan_days, db, user.id, routine, days=days, start_date=start_date)
+        forget_busy(context, user.id)
 
     suffix = f" {start_date.isoformat()}" if start_date else ""
     await update.message.reply_text(
@@ -1066,15 +1163,14 @@ async def cmd_autoplan(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     )
 
 async def cmd_delay(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    if len(context.args) < 2:
-        await update.message.reply_text(t("tasks.delay.usage", locale="ru"))
-        return
     try:
-        task_id = int(context.args[0])
-        minutes = int(context.args[1])
-    except ValueError:
-        await update.message.reply_text(t("tasks.delay.invalid_numbers", locale="ru"))
+        args = parse_task_args(
+            context.args, usage_key="tasks.delay.usage", invalid_key="tasks.delay.invalid_numbers", number=True
+        )
+    except BadArgs as exc:
+        await update.message.reply_text(t(exc.key, locale="ru"))
         return
+    task_id, minutes = args.task_id, args.number
     if minutes <= 0:
         await update.message.reply_text(t("tasks.delay.minutes_invalid", locale="ru"))
         return
@@ -1091,120 +1187,113 @@ async def cmd_delay(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
             await update.message.reply_text(t("tasks.delay.no_time", locale=locale))
             return
         delta = dt.timedelta(minutes=minutes)
+        old_day = task.planned_start.date()
         new_start = task.planned_start + delta
         new_end = task.planned_end + delta
-        crud.update_task_fields(db, user.id, task_id, planned_start=new_start, planned_end=new_end, schedule_source="assistant")
-        await update.message.reply_text(
-            t(
-                "tasks.delay.success",
-                locale=locale,
-                task_id=task_id,
-                start=new_start.strftime("%H:%M"),
-                end=new_end.strftime("%H:%M"),
-            )
-        )
+        crud.apply_task_fields(db, task, planned_start=new_start, planned_end=new_end, schedule_source="assistant")
+        forget_busy(context, user.id, old_day, new_start.date())
 
-async def cmd_slots(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    if not context.args:
-        await update.message.reply_text(t("tasks.slots.usage", locale="ru"))
-        return
+    await update.message.reply_text(
+        t(
+            "tasks.delay.success",
+            locale=locale,
+            task_id=task_id,
+            start=new_start.strftime("%H:%M"),
+            end=new_end.strftime("%H:%M"),
+        ),
+    )
+
+async def _load_user_task(update: Update, context: ContextTypes.DEFAULT_TYPE, db, task_id: int, *, only_user_key: str):
+    """Shared prologue of the slot commands: ready user plus one of their user tasks and the routine."""
+    user = await get_ready_user(update, context, db, start_onboarding=start_onboarding)
+    if not user:
+        return None
+    locale = locale_for_user(user)
+    task, routine = crud.get_task_with_routine(db, user.id, task_id)
+    if not task:
+        await update.message.reply_text(t("tasks.common.not_found", locale=locale))
+        return None
+    if task.task_type != "user":
+        await update.message.reply_text(t(only_user_key, locale=locale))
+        return None
+    return user, task, routine
 
+async def cmd_slots(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     try:
-        task_id = int(context.args[0])
-    except ValueError:
-        await update.message.reply_text(t("tasks.slots.id_invalid", locale="ru"))
+        args = parse_task_args(
+            context.args, usage_key="tasks.slots.usage", invalid_key="tasks.slots.id_invalid", date=True
+        )
+    except BadArgs as exc:
+        await update.message.reply_text(t(exc.key, locale="ru"))
         return
-
-    date_arg = context.args[1] if len(context.args) >= 2 else None
+    task_id = args.task_id
 
     with get_db_session() as db:
-        user = await get_ready_user(update, context, db, start_onboarding=start_onboarding)
-        if not user:
+        loaded = await _load_user_task(update, context, db, task_id, only_user_key="tasks.slots.only_user")
+        if not loaded:
             return
+        user, task, routine = loaded
         locale = locale_for_user(user)
-        routine = crud.get_routine(db, user.id)
-        task = crud.get_task(db, user.id, task_id)
-        if not task:
-            await update.message.reply_text(t("tasks.common.not_found", locale=locale))
-            return
-        if task.task_type != "user":
-            await update.message.reply_text(t("tasks.slots.only_user", locale=locale))
+        if args.error:
+            await update.message.reply_text(t(args.error, locale=locale))
             return
 
-        if date_arg:
-            try:
-                day = normalize_date_str(date_arg)
-            except ValueError:
-                await update.message.reply_text(t("tasks.plan.invalid_date", locale=locale))
-                return
-        else:
-            day = task.planned_start.date() if task.planned_start else now_local_naive().date()
+        day = args.date or default_day_for_task(task)
 
-        gaps, _, _ = _gaps_for_day(db, user.id, day, routine)
+        gaps = await run_db(_gaps_for_day, db, user.id, day, routine, context)
         text = format_gap_options(task, gaps, routine, day)
 
     await update.message.reply_text(text)
 
 async def cmd_place(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    if len(context.args) < 2:
-        await update.message.reply_text(t("tasks.place.usage", locale="ru"))
-        return
-
     try:
-        task_id = int(context.args[0])
-        slot_idx = int(context.args[1])
-    except ValueError:
-        await update.message.reply_text(t("tasks.place.id_invalid", locale="ru"))
+        args = parse_task_args(
+            context.args,
+            usage_key="tasks.place.usage",
+            invalid_key="tasks.place.id_invalid",
+            number=True,
+            hhmm="optional",
+            time_key="tasks.place.time_invalid",
+        )
+    except BadArgs as exc:
+        await update.message.reply_text(t(exc.key, locale="ru"))
         return
-
-    hhmm = context.args[2] if len(context.args) >= 3 else None
+    task_id, slot_idx = args.task_id, args.number
 
     with get_db_session() as db:
-        user = await get_ready_user(update, context, db, start_onboarding=start_onboarding)
-        if not user:
+        loaded = await _load_user_task(update, context, db, task_id, only_user_key="tasks.place.only_user")
+        if not loaded:
             return
+        user, task, routine = loaded
         locale = locale_for_user(user)
-        routine = crud.get_routine(db, user.id)
-        task = crud.get_task(db, user.id, task_id)
-        if not task:
-            await update.message.reply_text(t("tasks.common.not_found", locale=locale))
-            return
-        if task.task_type != "user":
-            await update.message.reply_text(t("tasks.place.only_user", locale=locale))
-            return
 
-        day = task.planned_start.date() if task.planned_start else now_local_naive().date()
+        day = default_day_for_task(task)
 
-        gaps, _, _ = _gaps_for_day(db, user.id, day, routine)
+        # Right after /slots the day's busy intervals are cached: skip the worker
+        # thread and the anchor/day queries entirely.
+        gaps = _cached_gaps(context, user.id, day, routine)
+        if gaps is None:
+            gaps = await run_db(_gaps_for_day, db, user.id, day, routine, context)
         if slot_idx < 1 or slot_idx > len(gaps):
             await update.message.reply_text(t("tasks.place.slot_invalid", locale=locale))
             return
 
         gap = gaps[slot_idx - 1]
-        display_minutes = task_display_minutes(task, routine)
 
-        if task.kind == "workout":
-            travel = dt.timedelta(minutes=routine.workout_travel_oneway_min)
-            core = dt.timedelta(minutes=max(task.estimate_minutes, routine.workout_block_min))
-            earliest = gap.start + travel
-            latest = gap.end - (core + travel)
-        else:
-            core = dt.timedelta(minutes=display_minutes)
-            earliest = gap.start
-            latest = gap.end - core
+        travel, core = task_padding(task, routine)
+        earliest = gap.start + travel
+        latest = gap.end - (core + travel)
 
         if latest < earliest:
             await update.message.reply_text(t("tasks.place.slot_unfit", locale=locale))
             return
+        if args.error:
+            await update.message.reply_text(t(args.error, locale=locale))
+            return
 
         start = earliest
-        if hhmm:
-            try:
-                t = parse_hhmm(hhmm)
-            except Exception:
-                await update.message.reply_text(t("tasks.place.time_invalid", locale=locale))
-                return
-            candidate = dt.datetime.combine(day, t)
+        if args.hhmm:
+            candidate = dt.datetime.combine(day, args.hhmm)
             if candidate < earliest or candidate > latest:
                 await update.message.reply_text(
                     t(
@@ -1218,7 +1307,9 @@ async def cmd_place(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
             start = candidate
 
         end = start + core
-        crud.update_task_fields(db, user.id, task_id, planned_start=start, planned_end=end, schedule_source="manual")
+        old_day = task.planned_start.date() if task.planned_start else None
+        crud.apply_task_fields(db, task, planned_start=start, planned_end=end, schedule_source="manual")
+        forget_busy(context, user.id, old_day, start.date())
 
     await update.message.reply_text(
         t(
@@ -1232,75 +1323,52 @@ async def cmd_place(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     )
 
 async def cmd_schedule(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    if len(context.args) < 2:
-        await update.message.reply_text(t("tasks.schedule_cmd.usage", locale="ru"))
-        return
-
     try:
-        task_id = int(context.args[0])
-    except ValueError:
-        await update.message.reply_text(t("tasks.schedule_cmd.id_invalid", locale="ru"))
+        args = parse_task_args(
+            context.args,
+            usage_key="tasks.schedule_cmd.usage",
+            invalid_key="tasks.schedule_cmd.id_invalid",
+            hhmm="required",
+            time_key="tasks.schedule_cmd.time_invalid",
+            date=True,
+        )
+    except BadArgs as exc:
+        await update.message.reply_text(t(exc.key, locale="ru"))
         return
-
-    hhmm = context.args[1]
-    date_arg = context.args[2] if len(context.args) >= 3 else None
+    task_id = args.task_id
 
     with get_db_session() as db:
-        user = await get_ready_user(update, context, db, start_onboarding=start_onboarding)
-        if not user:
+        loaded = await _load_user_task(update, context, db, task_id, only_user_key="tasks.schedule_cmd.only_user")
+        if not loaded:
             return
+        user, task, routine = loaded
         locale = locale_for_user(user)
-        routine = crud.get_routine(db, user.id)
-        task = crud.get_task(db, user.id, task_id)
-        if not task:
-            await update.message.reply_text(t("tasks.common.not_found", locale=locale))
-            return
-        if task.task_type != "user":
-            await update.message.reply_text(t("tasks.schedule_cmd.only_user", locale=locale))
-            return
-
-        if date_arg:
-            try:
-                day = normalize_date_str(date_arg)
-            except ValueError:
-                await update.message.reply_text(t("tasks.plan.invalid_date", locale=locale))
-                return
-        else:
-            day = task.planned_start.date() if task.planned_start else now_local_naive().date()
-
-        try:
-            t = parse_hhmm(hhmm)
-        except Exception:
-            await update.message.reply_text(t("tasks.schedule_cmd.time_invalid", locale=locale))
+        if args.error:
+            await update.message.reply_text(t(args.error, locale=locale))
             return
 
-        desired_start = dt.datetime.combine(day, t)
-        display_minutes = task_display_minutes(task, routine)
+        day = args.date or default_day_for_task(task)
 
-        gaps, _, _ = _gaps_for_day(db, user.id, day, routine)
+        desired_start = dt.datetime.combine(day, args.hhmm)
 
-        ok = False
-        for gap in gaps:
-            if task.kind == "workout":
-                travel = dt.timedelta(minutes=routine.workout_travel_oneway_min)
-                core = dt.timedelta(minutes=max(task.estimate_minutes, routine.workout_block_min))
-                earliest = gap.start + travel
-                latest = gap.end - (core + travel)
-            else:
-                core = dt.timedelta(minutes=display_minutes)
-                earliest = gap.start
-                latest = gap.end - core
+        travel, core = task_padding(task, routine)
+        # The padded block must sit inside one gap; it depends only on the task, not the gap.
+        needed_start = desired_start - travel
+        needed_end = desired_start + core + travel
 
-            if earliest <= desired_start <= latest:
-                ok = True
-                break
+        gaps = await run_db(_gaps_for_day, db, user.id, day, routine, context)
 
-        if not ok:
+        # Gaps are sorted and disjoint, so only the last one starting at or before
+        # the block can contain it.
+        idx = bisect_right(gaps, needed_start, key=lambda gap: gap.start) - 1
+        if idx < 0 or gaps[idx].end < needed_end:
             await update.message.reply_text(t("tasks.schedule_cmd.time_unfit", locale=locale))
             return
 
         end = desired_start + core
-        crud.update_task_fields(db, user.id, task_id, planned_start=desired_start, planned_end=end, schedule_source="manual")
+        old_day = task.planned_start.date() if task.planned_start else None
+        crud.apply_task_fields(db, task, planned_start=desired_start, planned_end=end, schedule_source="manual")
+        forget_busy(context, user.id, old_day, desired_start.date())
 
     await update.message.reply_text(
         t(
@@ -1318,7 +1386,7 @@ async def cmd_unschedule(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         await update.message.reply_text(t("tasks.unschedule.usage", locale="ru"))
         return
 
-    ids = extract_task_ids(" ".join(context.args))
+    ids = extract_task_ids_from_args(context.args)
     if not ids:
         await update.message.reply_text(t("tasks.common.id_invalid", locale="ru"))
         return
@@ -1327,13 +1395,13 @@ async def cmd_unschedule(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         user = await get_ready_user(update, context, db, start_onboarding=start_onboarding)
         if not user:
             return
-        await _apply_task_actions("unschedule", ids, update, db, user)
+        await _apply_task_actions("unschedule", ids, update, db, user, context)
 
 async def cmd_done(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if not context.args:
         await update.message.reply_text(t("tasks.done.usage", locale="ru"))
         return
-    ids = extract_task_ids(" ".join(context.args))
+    ids = extract_task_ids_from_args(context.args)
     if not ids:
         await update.message.reply_text(t("tasks.common.id_invalid", locale="ru"))
         return
@@ -1342,14 +1410,14 @@ async def cmd_done(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         user = await get_ready_user(update, context, db, start_onboarding=start_onboarding)
         if not user:
             return
-        await _apply_task_actions("done", ids, update, db, user)
+        await _apply_task_actions("done", ids, update, db, user, context)
 
 async def cmd_delete(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if not context.args:
         await update.message.reply_text(t("tasks.delete.usage", locale="ru"))
         return
 
-    ids = extract_task_ids(" ".join(context.args))
+    ids = extract_task_ids_from_args(context.args)
     if not ids:
         await update.message.reply_text(t("tasks.common.id_invalid", locale="ru"))
         return
@@ -1358,7 +1426,7 @@ async def cmd_delete(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
         user = await get_ready_user(update, context, db, start_onboarding=start_onboarding)
         if not user:
             return
-        await _apply_task_actions("delete", ids, update, db, user)
+        await _apply_task_actions("delete", ids, update, db, user, context)
 
 
 # Re-export helpers for message handler
@@ -1369,3 +1437,5 @@ handle_pending_schedule = _handle_pending_schedule
 handle_pending_task = _handle_pending_task
 handle_pending_conflict = _handle_pending_conflict
 handle_task_request = _handle_task_request
+cached_list_tasks = _cached_list_tasks
+format_task_choices = _format_task_choices
@@ -1,139 +1,147 @@
+import asyncio
 import datetime as dt
+import math
 
 from telegram.ext import ContextTypes
 
 from app import crud
 from app.bot.context import get_db_session
-from app.bot.utils import distance_m, now_local_naive
-from app.i18n.core import locale_for_user, t
+from app.bot.utils import now_local_naive, within_radius
+from app.i18n.core import formatter, locale_for_user
 from app.bot.rendering.keyboard import yes_no_keyboard
 from app.services.reminders import format_reminder_message
 from app.settings import settings
 
+# Concurrent sends per pass; keeps a burst well under Telegram's global rate limit.
+SEND_CONCURRENCY = 20
+
+
+async def _send_all(bot, messages: list[tuple[object, str, dict]]) -> list[bool]:
+    """Send (chat_id, text, extra kwargs) messages; True where the send succeeded.
+
+    Chats are served concurrently, but each chat gets its messages in order.
+    """
+    if not messages:
+        return []
+    by_chat: dict[object, list[int]] = {}
+    for index, (chat_id, _text, _extra) in enumerate(messages):
+        by_chat.setdefault(chat_id, []).append(index)
+    sent = [False] * len(messages)
+    semaphore = asyncio.Semaphore(SEND_CONCURRENCY)
+
+    async def send_chat(indexes: list[int]) -> None:
+        async with semaphore:
+            for index in indexes:
+                chat_id, text, extra = messages[index]
+                try:
+                    await bot.send_message(chat_id=chat_id, text=text, **extra)
+                except Exception:
+                    continue
+                sent[index] = True
+
+    await asyncio.gather(*(send_chat(indexes) for indexes in by_chat.values()))
+    return sent
+
+
+def _chat_id(user):
+    try:
+        return int(user.telegram_chat_id)
+    except ValueError:
+        return user.telegram_chat_id
+
 
 async def reminder_job(context: ContextTypes.DEFAULT_TYPE) -> None:
     now = now_local_naive()
     with get_db_session() as db:
-        users = {u.id: u for u in crud.list_users(db)}
-
-        for user_id, user in users.items():
-            if not getattr(user, "is_active", True):
-                continue
-            locale = locale_for_user(user)
-            tasks = crud.list_tasks_for_reminders(db, user_id, now, settings.REMINDER_LEAD_MIN)
-            if not tasks:
-                continue
-            try:
-                chat_id = int(user.telegram_chat_id)
-            except ValueError:
-                chat_id = user.telegram_chat_id
+        users = {u.id: u for u in crud.list_active_users(db)}
+        user_ids = list(users)
+        locales = {user_id: locale_for_user(user) for user_id, user in users.items()}
+        chat_ids = {user_id: _chat_id(user) for user_id, user in users.items()}
+        # Read before the per-pass commits below expire the user rows.
+        stale_after = dt.timedelta(minutes=settings.LOCATION_STALE_MIN)
+        located = {
+            user_id: (user.last_lat, user.last_lon)
+            for user_id, user in users.items()
+            if user.last_lat is not None
+            and user.last_lon is not None
+            and user.last_location_at is not None
+            and (now - user.last_location_at) <= stale_after
+        }
 
+        # One query and one stamping UPDATE per pass for all users, instead of one per user or task.
+        # Each pass commits its stamps right after sending, so a failure in a later pass
+        # cannot roll back stamps for messages already delivered.
+        messages = []
+        stamped = []
+        due = crud.list_tasks_for_reminders_by_user(db, user_ids, now, settings.REMINDER_LEAD_MIN)
+        for user_id, tasks in due.items():
+            locale, chat_id = locales[user_id], chat_ids[user_id]
             try:
                 message = format_reminder_message(tasks, locale=locale)
-                await context.bot.send_message(chat_id=chat_id, text=message)
             except Exception:
                 continue
+            messages.append((chat_id, message, {}))
+            stamped.append(tasks)
 
-            for task in tasks:
-                task.reminder_sent_at = now
+        sent_ids = [
+            task.id
+            for tasks, sent in zip(stamped, await _send_all(context.bot, messages))
+            if sent
+            for task in tasks
+        ]
+        crud.stamp_tasks(db, sent_ids, reminder_sent_at=now)
+        db.commit()
 
         # Start prompt at task time
-        for user_id, user in users.items():
-            if not getattr(user, "is_active", True):
-                continue
-            locale = locale_for_user(user)
-            start_tasks = crud.list_tasks_for_start_prompt(
-                db,
-                user_id,
-                now,
-                settings.START_PROMPT_WINDOW_MIN,
-            )
-            if not start_tasks:
-                continue
-            try:
-                chat_id = int(user.telegram_chat_id)
-            except ValueError:
-                chat_id = user.telegram_chat_id
+        messages = []
+        stamped = []
+        starting = crud.list_tasks_for_start_prompt_by_user(db, user_ids, now, settings.START_PROMPT_WINDOW_MIN)
+        for user_id, start_tasks in starting.items():
+            locale, chat_id = locales[user_id], chat_ids[user_id]
+            ask = formatter("start_prompt.ask", locale)
+            keyboard = yes_no_keyboard(locale)
             for task in start_tasks:
-                try:
-                    await context.bot.send_message(
-                        chat_id=chat_id,
-                        text=t(
-                            "start_prompt.ask",
-                            locale=locale,
-                            title=task.title,
-                            task_id=task.id,
-                        ),
-                        reply_markup=yes_no_keyboard(locale),
-                    )
-                    crud.mark_start_prompt_sent(db, user_id, task.id, now)
-                except Exception:
-                    continue
+                text = ask(title=task.title, task_id=task.id)
+                messages.append((chat_id, text, {"reply_markup": keyboard}))
+                stamped.append(task)
+
+        sent_ids = [task.id for task, sent in zip(stamped, await _send_all(context.bot, messages)) if sent]
+        crud.stamp_tasks(db, sent_ids, start_prompt_sent_at=now, start_prompt_pending=True)
+        db.commit()
 
         # Late prompt
-        for user_id, user in users.items():
-            if not getattr(user, "is_active", True):
-                continue
-            locale = locale_for_user(user)
-            late_tasks = crud.list_late_tasks(db, user_id, now, settings.DELAY_GRACE_MIN)
-            if not late_tasks:
-                continue
-            try:
-                chat_id = int(user.telegram_chat_id)
-            except ValueError:
-                chat_id = user.telegram_chat_id
+        messages = []
+        stamped = []
+        late = crud.list_late_tasks_by_user(db, user_ids, now, settings.DELAY_GRACE_MIN)
+        for user_id, late_tasks in late.items():
+            chat_id = chat_ids[user_id]
+            late_prompt = formatter("reminders.late_prompt", locales[user_id])
             for task in late_tasks:
-                try:
-                    await context.bot.send_message(
-                        chat_id=chat_id,
-                        text=t(
-                            "reminders.late_prompt",
-                            locale=locale,
-                            title=task.title,
-                            task_id=task.id,
-                        ),
-                    )
-                    task.late_prompt_sent_at = now
-                except Exception:
-                    continue
+                messages.append((chat_id, late_prompt(title=task.title, task_id=task.id), {}))
+                stamped.append(task)
+
+        sent_ids = [task.id for task, sent in zip(stamped, await _send_all(context.bot, messages)) if sent]
+        crud.stamp_tasks(db, sent_ids, late_prompt_sent_at=now)
+        db.commit()
 
         # Location-based reminders
-        for user_id, user in users.items():
-            if not getattr(user, "is_active", True):
-                continue
-            locale = locale_for_user(user)
-            if user.last_lat is None or user.last_lon is None or user.last_location_at is None:
-                continue
-            if (now - user.last_location_at) > dt.timedelta(minutes=settings.LOCATION_STALE_MIN):
-                continue
-            tasks_with_location = crud.list_tasks_with_location(db, user_id)
-            if not tasks_with_location:
-                continue
-            try:
-                chat_id = int(user.telegram_chat_id)
-            except ValueError:
-                chat_id = user.telegram_chat_id
+        messages = []
+        stamped = []
+        # The SQL box covers the widest task radius per user; each task's own radius is checked below.
+        nearby = crud.list_tasks_near_by_user(db, located, settings.LOCATION_MAX_RADIUS_M)
+        for user_id, tasks_with_location in nearby.items():
+            lat, lon = located[user_id]
+            chat_id = chat_ids[user_id]
+            arrived = formatter("reminders.location", locales[user_id])
+            cos_lat = math.cos(math.radians(lat))
             for task in tasks_with_location:
-                if task.location_reminder_sent_at is not None:
-                    continue
                 radius = task.location_radius_m or 150
-                dist = distance_m(user.last_lat, user.last_lon, task.location_lat, task.location_lon)
-                if dist > radius:
+                if not within_radius(lat, lon, task.location_lat, task.location_lon, radius, cos_lat):
                     continue
                 label = f" ({task.location_label})" if task.location_label else ""
-                try:
-                    await context.bot.send_message(
-                        chat_id=chat_id,
-                        text=t(
-                            "reminders.location",
-                            locale=locale,
-                            label=label,
-                            title=task.title,
-                            task_id=task.id,
-                        ),
-                    )
-                    task.location_reminder_sent_at = now
-                except Exception:
-                    continue
+                messages.append((chat_id, arrived(label=label, title=task.title, task_id=task.id), {}))
+                stamped.append(task)
 
+        sent_ids = [task.id for task, sent in zip(stamped, await _send_all(context.bot, messages)) if sent]
+        crud.stamp_tasks(db, sent_ids, location_reminder_sent_at=now)
         db.commit()
@@ -26,7 +26,7 @@ def build_application() -> Application:
         )
         raise RuntimeError(hint)
 
-    app = Application.builder().token(token).build()
+    app = Application.builder().token(token).concurrent_updates(True).build()
     register_handlers(app)
     return app
 
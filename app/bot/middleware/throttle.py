@@ -5,19 +5,29 @@ from collections.abc import Awaitable, Callable
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from app.bot.context import get_db_session, get_user
+from app.bot.context import cached_locale, get_db_session, get_user, store_locale
 from app.bot.throttle import throttle
 from app.i18n.core import locale_for_user, t
 
 HandlerFunc = Callable[[Update, ContextTypes.DEFAULT_TYPE], Awaitable[None]]
 
 
-async def _resolve_locale(update: Update) -> str:
+async def _resolve_locale(update: Update, context: ContextTypes.DEFAULT_TYPE) -> str:
     if not update.effective_chat:
         return "ru"
-    with get_db_session() as db:
-        user = await get_user(update, db)
-        return locale_for_user(user)
+    # Throttled floods hit this repeatedly; skip the user lookup while the locale is fresh.
+    locale = cached_locale(context)
+    if locale is None:
+        with get_db_session() as db:
+            user = await get_user(update, db)
+            locale = locale_for_user(user)
+        store_locale(context, locale)
+    return locale
+
+
+def update_user_key(update: Update) -> str:
+    """Throttle key of the sender; every path taking the serial or heavy lock must use it."""
+    return str(getattr(update.effective_user, "id", None) or update.effective_chat.id)
 
 
 def wrap_throttled(handler: HandlerFunc, *, heavy: bool = False, dedupe: bool = True) -> HandlerFunc:
@@ -27,29 +37,33 @@ def wrap_throttled(handler: HandlerFunc, *, heavy: bool = False, dedupe: bool =
             return
 
         text = update.message.text.strip() if dedupe and update.message.text else None
-        user_key = str(getattr(update.effective_user, "id", None) or update.effective_chat.id)
+        user_key = update_user_key(update)
 
         decision = throttle().check(user_key, text=text, heavy=heavy)
         if not decision.allowed:
             if decision.deduped:
                 return
-            locale = await _resolve_locale(update)
+            locale = await _resolve_locale(update, context)
             reason_key = decision.reason or "bot.throttle.cooldown"
             await update.message.reply_text(
                 t(reason_key, locale=locale, retry_after=decision.retry_after),
             )
             return
 
-        if heavy:
+        # Updates run concurrently across users; one user's updates stay ordered so
+        # pending dialogs in user_data are never mutated by two handlers at once.
+        # The serial lock is always taken before the heavy lock (the text handler
+        # takes it inside too), so a queued update never sees an earlier one's lock.
+        async with throttle().get_serial_lock(user_key):
+            if not heavy:
+                await handler(update, context)
+                return
             lock = throttle().get_lock(user_key)
             if lock.locked():
-                locale = await _resolve_locale(update)
+                locale = await _resolve_locale(update, context)
                 await update.message.reply_text(t("bot.throttle.busy", locale=locale))
                 return
             async with lock:
                 await handler(update, context)
-            return
-
-        await handler(update, context)
 
     return _wrapped
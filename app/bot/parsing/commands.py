@@ -1,6 +1,27 @@
+import datetime as dt
+from dataclasses import dataclass
 from typing import Optional
 
 from app.bot.parsing.ru_reply import parse_reply
+from app.services.slots import normalize_date_str, parse_hhmm
+
+
+class BadArgs(ValueError):
+    """Invalid command arguments; ``key`` is the i18n message to reply with."""
+
+    def __init__(self, key: str) -> None:
+        super().__init__(key)
+        self.key = key
+
+
+@dataclass(frozen=True)
+class TaskArgs:
+    task_id: int
+    number: int | None = None
+    hhmm: dt.time | None = None
+    date: dt.date | None = None
+    # i18n key of a malformed time or date, replied once the user's locale is known.
+    error: str | None = None
 
 
 def parse_command_text(text: str) -> tuple[str, list[str]] | None:
@@ -20,3 +41,51 @@ def parse_yes_no(text: str) -> Optional[bool]:
     if flags.is_no and not flags.is_yes:
         return False
     return None
+
+
+def parse_task_args(
+    args: list[str],
+    *,
+    usage_key: str,
+    invalid_key: str,
+    number: bool = False,
+    hhmm: str | None = None,
+    time_key: str | None = None,
+    date: bool = False,
+    date_key: str = "tasks.plan.invalid_date",
+) -> TaskArgs:
+    """Parse ``<id> [number] [HH:MM] [YYYY-MM-DD]`` task command arguments.
+
+    ``hhmm`` is None when the command takes no time, otherwise "required" or
+    "optional". A missing argument or malformed id/number raises BadArgs carrying
+    the i18n key of the error. A malformed time or date does not raise: its key is
+    returned in ``error`` (the date wins when both are bad) so the handler can reply
+    in the user's locale after loading the task.
+    """
+    required = 1 + int(number) + int(hhmm == "required")
+    if len(args) < required:
+        raise BadArgs(usage_key)
+    try:
+        task_id = int(args[0])
+        value = int(args[1]) if number else None
+    except ValueError:
+        raise BadArgs(invalid_key) from None
+    pos = 2 if number else 1
+
+    error = None
+    time_value = None
+    if hhmm and len(args) > pos:
+        try:
+            time_value = parse_hhmm(args[pos])
+        except ValueError:
+            error = time_key or invalid_key
+        pos += 1
+
+    day = None
+    if date and len(args) > pos:
+        try:
+            day = normalize_date_str(args[pos])
+        except ValueError:
+            error = date_key
+
+    return TaskArgs(task_id=task_id, number=value, hhmm=time_value, date=day, error=error)
@@ -31,41 +31,67 @@ def _load_list(name: str) -> set[str]:
     return {str(item).strip().lower() for item in data if str(item).strip()}
 
 
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+
+
 def _normalize(text: str) -> str:
-    cleaned = re.sub(r"[^\w\s]", " ", text.strip().lower())
-    cleaned = re.sub(r"\s+", " ", cleaned).strip()
+    cleaned = _PUNCT_RE.sub(" ", text.strip().lower())
+    cleaned = _SPACE_RE.sub(" ", cleaned).strip()
     return cleaned
 
 
+@lru_cache(maxsize=8)
+def _load_vocab(name: str) -> tuple[frozenset[str], re.Pattern | None]:
+    """Split a word list into single tokens (set lookup) and one phrase pattern.
+
+    Entries go through the same normalization as replies, so listed phrases with
+    punctuation ("да, именно") can match the normalized text.
+    """
+    items = {_normalize(item) for item in _load_list(name)}
+    tokens = frozenset(item for item in items if item and " " not in item)
+    phrases = sorted(item for item in items if " " in item)
+    phrase_re = re.compile("|".join(map(re.escape, phrases))) if phrases else None
+    return tokens, phrase_re
+
+
+_YES, _NO, _CANCEL, _HELP = 1, 2, 4, 8
+_VOCABS = (
+    ("ru_affirmations.json", _YES),
+    ("ru_negations.json", _NO),
+    ("ru_cancel.json", _CANCEL),
+    ("ru_help.json", _HELP),
+)
+
+
+@lru_cache(maxsize=1)
+def _token_flags() -> dict[str, int]:
+    """Token -> bitmask of every vocabulary it belongs to."""
+    flags: dict[str, int] = {}
+    for name, bit in _VOCABS:
+        for token in _load_vocab(name)[0]:
+            flags[token] = flags.get(token, 0) | bit
+    return flags
+
+
+@lru_cache(maxsize=1024)
 def parse_reply(text: str) -> ReplyFlags:
     normalized = _normalize(text)
-    tokens = normalized.split() if normalized else []
-    token_set = set(tokens)
-
-    yes = _load_list("ru_affirmations.json")
-    no = _load_list("ru_negations.json")
-    cancel = _load_list("ru_cancel.json")
-    help_words = _load_list("ru_help.json")
-
-    yes_tokens = {item for item in yes if " " not in item}
-    no_tokens = {item for item in no if " " not in item}
-    cancel_tokens = {item for item in cancel if " " not in item}
-    help_tokens = {item for item in help_words if " " not in item}
-
-    yes_phrases = [item for item in yes if " " in item]
-    no_phrases = [item for item in no if " " in item]
-    cancel_phrases = [item for item in cancel if " " in item]
-    help_phrases = [item for item in help_words if " " in item]
-
-    is_yes = bool(token_set & yes_tokens) or any(p in normalized for p in yes_phrases)
-    is_no = bool(token_set & no_tokens) or any(p in normalized for p in no_phrases)
-    is_cancel = bool(token_set & cancel_tokens) or any(p in normalized for p in cancel_phrases)
-    is_help = bool(token_set & help_tokens) or any(p in normalized for p in help_phrases)
+    token_flags = _token_flags()
+    flags = 0
+    for token in normalized.split():
+        flags |= token_flags.get(token, 0)
+    # Phrases are only scanned for categories no single token matched.
+    for name, bit in _VOCABS:
+        if not flags & bit:
+            phrase_re = _load_vocab(name)[1]
+            if phrase_re is not None and phrase_re.search(normalized):
+                flags |= bit
 
     return ReplyFlags(
-        is_yes=is_yes,
-        is_no=is_no,
-        is_cancel=is_cancel,
-        is_help=is_help,
+        is_yes=bool(flags & _YES),
+        is_no=bool(flags & _NO),
+        is_cancel=bool(flags & _CANCEL),
+        is_help=bool(flags & _HELP),
         normalized=normalized,
     )
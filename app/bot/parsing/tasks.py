@@ -1,11 +1,15 @@
 import re
 
+# Leading "задача:" and polite filler words are dropped in a single substitution.
+_TITLE_NOISE_RE = re.compile(
+    r"^(?:задача|задачи)\b[:\s]*|\b(?:пожалуйста|пж|плиз|пожалуй)\b",
+    re.IGNORECASE,
+)
+
 
 def _normalize_task_title(title: str) -> str:
-    cleaned = re.sub(r"\s+", " ", title).strip()
-    cleaned = re.sub(r"^(задача|задачи)\b[:\s]*", "", cleaned, flags=re.IGNORECASE)
-    cleaned = re.sub(r"\b(пожалуйста|пж|плиз|пожалуй)\b", "", cleaned, flags=re.IGNORECASE)
-    cleaned = re.sub(r"\s+", " ", cleaned).strip(" ,.-")
+    cleaned = _TITLE_NOISE_RE.sub("", " ".join(title.split()))
+    cleaned = " ".join(cleaned.split()).strip(" ,.-")
     return cleaned or title
 
 
@@ -1,100 +1,117 @@
 import re
 
+_TAGGED_ID_RE = re.compile(r"(?:\b(?:id|ид)\s*[:#=]?\s*|[#№])(\d+)", re.IGNORECASE)
+_BARE_ID_RE = re.compile(r"\b\d+\b")
+
 
 def _extract_task_ids(text: str) -> list[int]:
-    ids: list[int] = []
-    for m in re.finditer(r"(?:\b(?:id|ид)\s*[:#=]?\s*|[#№])(\d+)", text, flags=re.IGNORECASE):
-        ids.append(int(m.group(1)))
-    if ids:
-        return list(dict.fromkeys(ids))
-    return [int(x) for x in re.findall(r"\b\d+\b", text)]
+    """Unique task ids in first-seen order; tagged ids (id27, #27) win over bare numbers."""
+    ids = [int(m.group(1)) for m in _TAGGED_ID_RE.finditer(text)]
+    if not ids:
+        ids = [int(x) for x in _BARE_ID_RE.findall(text)]
+    return list(dict.fromkeys(ids))
+
+
+def _extract_task_ids_from_args(args: list[str]) -> list[int]:
+    """Task ids from already-tokenized command args; plain "/done 3 5" skips the regex scan."""
+    if args and all(arg.isdecimal() for arg in args):
+        return list(dict.fromkeys(int(arg) for arg in args))
+    return _extract_task_ids(" ".join(args))
+
+
+_SKIP_WORDS = frozenset({"skip", "later", "пропустить", "потом", "не знаю", "не уверен"})
+_NO_DUE_WORDS = frozenset({"без срока", "нет срока", "без дедлайна", "no due", "no deadline"})
+_WEEKDAY_MAP = {
+    "0": 0,
+    "1": 1,
+    "2": 2,
+    "3": 3,
+    "4": 4,
+    "5": 5,
+    "6": 6,
+    "mon": 0,
+    "monday": 0,
+    "tue": 1,
+    "tues": 1,
+    "tuesday": 1,
+    "wed": 2,
+    "wednesday": 2,
+    "thu": 3,
+    "thur": 3,
+    "thurs": 3,
+    "thursday": 3,
+    "fri": 4,
+    "friday": 4,
+    "sat": 5,
+    "saturday": 5,
+    "sun": 6,
+    "sunday": 6,
+    "пн": 0,
+    "понедельник": 0,
+    "вт": 1,
+    "вторник": 1,
+    "ср": 2,
+    "среда": 2,
+    "чт": 3,
+    "четверг": 3,
+    "пт": 4,
+    "пятница": 4,
+    "сб": 5,
+    "суббота": 5,
+    "вс": 6,
+    "воскресенье": 6,
+}
 
 
 def _is_skip(text: str) -> bool:
-    return text.strip().lower() in {"skip", "later", "пропустить", "потом", "не знаю", "не уверен"}
+    return text.strip().lower() in _SKIP_WORDS
 
 
 def _is_no_due(text: str) -> bool:
-    lower = text.strip().lower()
-    return lower in {"без срока", "нет срока", "без дедлайна", "no due", "no deadline"}
+    return text.strip().lower() in _NO_DUE_WORDS
 
 
 def _parse_weekday(value: str) -> int | None:
-    value = value.strip().lower()
-    mapping = {
-        "0": 0,
-        "1": 1,
-        "2": 2,
-        "3": 3,
-        "4": 4,
-        "5": 5,
-        "6": 6,
-        "mon": 0,
-        "monday": 0,
-        "tue": 1,
-        "tues": 1,
-        "tuesday": 1,
-        "wed": 2,
-        "wednesday": 2,
-        "thu": 3,
-        "thur": 3,
-        "thurs": 3,
-        "thursday": 3,
-        "fri": 4,
-        "friday": 4,
-        "sat": 5,
-        "saturday": 5,
-        "sun": 6,
-        "sunday": 6,
-        "пн": 0,
-        "понедельник": 0,
-        "вт": 1,
-        "вторник": 1,
-        "ср": 2,
-        "среда": 2,
-        "чт": 3,
-        "четверг": 3,
-        "пт": 4,
-        "пятница": 4,
-        "сб": 5,
-        "суббота": 5,
-        "вс": 6,
-        "воскресенье": 6,
-    }
-    return mapping.get(value)
+    return _WEEKDAY_MAP.get(value.strip().lower())
+
+
+_ITEM_SEP_RE = re.compile(r"[;,]")
+_AND_RE = re.compile(r"\band\b", re.IGNORECASE)
 
 
 def _split_items(text: str) -> list[str]:
-    items = [i.strip() for i in re.split(r"[;,]", text) if i.strip()]
-    if len(items) == 1 and re.search(r"\band\b", items[0], re.IGNORECASE):
-        items = [i.strip() for i in re.split(r"\band\b", items[0], flags=re.IGNORECASE) if i.strip()]
+    items = [i.strip() for i in _ITEM_SEP_RE.split(text) if i.strip()]
+    if len(items) == 1 and _AND_RE.search(items[0]):
+        items = [i.strip() for i in _AND_RE.split(items[0]) if i.strip()]
     return items
 
 
+_ROUTINE_TRIGGERS = (
+    "every morning",
+    "each morning",
+    "add to routine",
+    "morning routine",
+    "routine:",
+    "каждое утро",
+    "утренняя рутина",
+    "добавь в рутину",
+    "в рутину",
+    "рутина:",
+)
+# One scan detects any trigger and one substitution strips them all.
+_ROUTINE_TRIGGER_RE = re.compile("|".join(map(re.escape, _ROUTINE_TRIGGERS)), re.IGNORECASE)
+
+
 def _extract_routine_items(text: str) -> list[str]:
-    lower = text.lower()
-    triggers = [
-        "every morning",
-        "each morning",
-        "add to routine",
-        "morning routine",
-        "routine:",
-        "каждое утро",
-        "утренняя рутина",
-        "добавь в рутину",
-        "в рутину",
-        "рутина:",
-    ]
-    if not any(t in lower for t in triggers):
+    if not _ROUTINE_TRIGGER_RE.search(text):
         return []
-    cleaned = text
-    for t in triggers:
-        cleaned = re.sub(re.escape(t), "", cleaned, flags=re.IGNORECASE)
+    cleaned = _ROUTINE_TRIGGER_RE.sub("", text)
     cleaned = cleaned.replace(":", " ")
     return _split_items(cleaned)
 
 
 extract_task_ids = _extract_task_ids
+extract_task_ids_from_args = _extract_task_ids_from_args
 is_skip = _is_skip
 is_no_due = _is_no_due
 parse_weekday = _parse_weekday
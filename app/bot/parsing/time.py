@@ -2,6 +2,7 @@
 
 import datetime as dt
 import re
+from functools import lru_cache
 
 MONTH_MAP = {
     "января": 1,
@@ -108,6 +109,54 @@ ORDINAL_DAY_MONTH_RE = re.compile(
 )
 
 
+WEEKDAY_RE = re.compile(
+    r"\b(следующ(?:ий|ая|ее)\s+)?(пн|вт|ср|чт|пт|сб|вс|понедельник|вторник|среда|четверг|пятница|суббота|воскресенье)\b"
+)
+DURATION_MINUTES_RE = re.compile(r"\b(\d{1,3})\s*(мин|минут|минуты|m)\b")
+DURATION_HOURS_RE = re.compile(r"\b(\d{1,2})(?:[.,](\d))?\s*(час|часа|часов|h)\b")
+TIME_RANGE_RE = re.compile(r"(?:с\s*)?(\d{1,2})(?::(\d{2}))?\s*(?:-|–|—|до|по)\s*(\d{1,2})(?::(\d{2}))?")
+TIME_DASH_RANGE_RE = re.compile(r"(\d{1,2})(?::(\d{2}))?\s*[-–—]\s*(\d{1,2})(?::(\d{2}))?")
+TIME_TOKEN_RE = re.compile(r"\b(\d{1,2})(?::(\d{2}))?\b")
+MERIDIAN_PM_RE = re.compile(r"\b(pm|вечера|дня)\b")
+MERIDIAN_AM_RE = re.compile(r"\b(am|утра|ночи)\b")
+DUE_INTENT_RE = re.compile(r"\b(срок|дедлайн|deadline)\b")
+DAY_NUMBER_RE = re.compile(r"\d{1,2}")
+BARE_DAY_NUMBER_RE = re.compile(r"\b\d{1,2}\b")
+
+HOUR_WORD_MAP = {
+    "ноль": 0,
+    "один": 1,
+    "одна": 1,
+    "два": 2,
+    "две": 2,
+    "три": 3,
+    "четыре": 4,
+    "пять": 5,
+    "шесть": 6,
+    "семь": 7,
+    "восемь": 8,
+    "девять": 9,
+    "десять": 10,
+    "одиннадцать": 11,
+    "двенадцать": 12,
+    "тринадцать": 13,
+    "четырнадцать": 14,
+    "пятнадцать": 15,
+    "шестнадцать": 16,
+    "семнадцать": 17,
+    "восемнадцать": 18,
+    "девятнадцать": 19,
+    "двадцать": 20,
+    "двадцать один": 21,
+    "двадцать два": 22,
+    "двадцать три": 23,
+}
+# Longer words win regardless of position, matching the old per-word scan order.
+HOUR_WORDS = sorted(HOUR_WORD_MAP.keys(), key=len, reverse=True)
+HOUR_WORD_RANK = {word: rank for rank, word in enumerate(HOUR_WORDS)}
+HOUR_WORD_RE = re.compile(r"\b(" + "|".join(re.escape(word) for word in HOUR_WORDS) + r")\b")
+
+
 def _normalize_year(day: int, month: int, now: dt.datetime) -> int:
     year = now.year
     try:
@@ -120,10 +169,23 @@ def _normalize_year(day: int, month: int, now: dt.datetime) -> int:
 
 
 def _extract_dates_from_text(text: str, now: dt.datetime) -> list[dt.date]:
+    return _extract_dates_lower(text.lower(), now)
+
+
+# The *_lower helpers take text that is already lowercased, so a caller running
+# several of them on one message lowercases it once.
+def _extract_dates_lower(lower: str, now: dt.datetime) -> list[dt.date]:
+    return list(_extract_dates_on(lower, now.date()))
+
+
+# Users resend the same short phrases ("завтра", "в 10"), so the pure parsers below
+# are memoized; dates only depend on the calendar day, not the time of 'now'.
+@lru_cache(maxsize=512)
+def _extract_dates_on(lower: str, today: dt.date) -> tuple[dt.date, ...]:
+    now = dt.datetime.combine(today, dt.time())
     dates: set[dt.date] = set()
-    lower = text.lower()
 
-    for m in DATE_TOKEN_RE.finditer(text):
+    for m in DATE_TOKEN_RE.finditer(lower):
         try:
             dates.add(dt.date.fromisoformat(m.group(1)))
         except ValueError:
@@ -164,7 +226,7 @@ def _extract_dates_from_text(text: str, now: dt.datetime) -> list[dt.date]:
         month = MONTH_MAP.get(month_token)
         if not month:
             continue
-        for day_str in re.findall(r"\d{1,2}", days_raw):
+        for day_str in DAY_NUMBER_RE.findall(days_raw):
             day = int(day_str)
             year = _normalize_year(day, month, now)
             try:
@@ -198,7 +260,7 @@ def _extract_dates_from_text(text: str, now: dt.datetime) -> list[dt.date]:
             continue
 
     if not dates and "числ" in lower and not MONTH_RE.search(lower):
-        for day_str in re.findall(r"\b\d{1,2}\b", lower):
+        for day_str in BARE_DAY_NUMBER_RE.findall(lower):
             day = int(day_str)
             month = now.month
             year = _normalize_year(day, month, now)
@@ -207,11 +269,14 @@ def _extract_dates_from_text(text: str, now: dt.datetime) -> list[dt.date]:
             except ValueError:
                 continue
 
-    return sorted(dates)
+    return tuple(sorted(dates))
 
 
 def _detect_relative_day(text: str, now: dt.datetime) -> dt.date | None:
-    lower = text.lower()
+    return _detect_relative_day_lower(text.lower(), now)
+
+
+def _detect_relative_day_lower(lower: str, now: dt.datetime) -> dt.date | None:
     if "сегодня" in lower or "today" in lower:
         return now.date()
     if "послезавтра" in lower:
@@ -222,16 +287,17 @@ def _detect_relative_day(text: str, now: dt.datetime) -> dt.date | None:
 
 
 def resolve_date_ru(text: str, now: dt.datetime) -> dt.date | None:
-    dates = _extract_dates_from_text(text, now)
+    return _resolve_date_lower(text.lower(), now)
+
+
+def _resolve_date_lower(lower: str, now: dt.datetime) -> dt.date | None:
+    dates = _extract_dates_lower(lower, now)
     if dates:
         return dates[0]
-    relative = _detect_relative_day(text, now)
+    relative = _detect_relative_day_lower(lower, now)
     if relative:
         return relative
-    m = re.search(
-        r"\b(следующ(?:ий|ая|ее)\s+)?(пн|вт|ср|чт|пт|сб|вс|понедельник|вторник|среда|четверг|пятница|суббота|воскресенье)\b",
-        text.lower(),
-    )
+    m = WEEKDAY_RE.search(lower)
     if m:
         token = m.group(2)
         target = RUS_WEEKDAY_MAP.get(token, now.weekday())
@@ -242,11 +308,15 @@ def resolve_date_ru(text: str, now: dt.datetime) -> dt.date | None:
 
 
 def _parse_duration_minutes(text: str) -> int | None:
-    lower = text.lower()
-    m = re.search(r"\b(\d{1,3})\s*(мин|минут|минуты|m)\b", lower)
+    return _parse_duration_lower(text.lower())
+
+
+@lru_cache(maxsize=512)
+def _parse_duration_lower(lower: str) -> int | None:
+    m = DURATION_MINUTES_RE.search(lower)
     if m:
         return int(m.group(1))
-    m = re.search(r"\b(\d{1,2})(?:[.,](\d))?\s*(час|часа|часов|h)\b", lower)
+    m = DURATION_HOURS_RE.search(lower)
     if m:
         hours = int(m.group(1))
         frac = int(m.group(2) or 0)
@@ -256,15 +326,16 @@ def _parse_duration_minutes(text: str) -> int | None:
 
 
 def _parse_time_range(text: str) -> tuple[dt.time, dt.time] | None:
-    lower = text.lower()
-    range_match = re.search(
-        r"(?:с\s*)?(\d{1,2})(?::(\d{2}))?\s*(?:-|–|—|до|по)\s*(\d{1,2})(?::(\d{2}))?",
-        lower,
-    )
+    return _parse_time_range_lower(text.lower())
+
+
+@lru_cache(maxsize=512)
+def _parse_time_range_lower(lower: str) -> tuple[dt.time, dt.time] | None:
+    range_match = TIME_RANGE_RE.search(lower)
     if not range_match:
         return None
-    meridian_pm = bool(re.search(r"\b(pm|вечера|дня)\b", lower))
-    meridian_am = bool(re.search(r"\b(am|утра|ночи)\b", lower))
+    meridian_pm = bool(MERIDIAN_PM_RE.search(lower))
+    meridian_am = bool(MERIDIAN_AM_RE.search(lower))
 
     def apply_meridian(hh: int) -> int:
         if meridian_pm and hh < 12:
@@ -283,15 +354,19 @@ def _parse_time_range(text: str) -> tuple[dt.time, dt.time] | None:
 
 
 def _parse_time_value(text: str) -> dt.time | None:
-    lower = text.lower()
+    return _parse_time_value_lower(text.lower())
+
+
+@lru_cache(maxsize=512)
+def _parse_time_value_lower(lower: str) -> dt.time | None:
     if "полдень" in lower:
         return dt.time(12, 0)
     if "полночь" in lower:
         return dt.time(0, 0)
 
-    range_match = re.search(r"(\d{1,2})(?::(\d{2}))?\s*[-–—]\s*(\d{1,2})(?::(\d{2}))?", lower)
-    meridian_pm = bool(re.search(r"\b(pm|вечера|дня)\b", lower))
-    meridian_am = bool(re.search(r"\b(am|утра|ночи)\b", lower))
+    range_match = TIME_DASH_RANGE_RE.search(lower)
+    meridian_pm = bool(MERIDIAN_PM_RE.search(lower))
+    meridian_am = bool(MERIDIAN_AM_RE.search(lower))
 
     def apply_meridian(hh: int) -> int:
         if meridian_pm and hh < 12:
@@ -316,7 +391,7 @@ def _parse_time_value(text: str) -> dt.time | None:
         midpoint = start + (end - start) / 2
         return midpoint.time().replace(second=0, microsecond=0)
 
-    m = re.search(r"\b(\d{1,2})(?::(\d{2}))?\b", lower)
+    m = TIME_TOKEN_RE.search(lower)
     if m:
         hh = apply_meridian(int(m.group(1)))
         mm = int(m.group(2) or 0)
@@ -324,47 +399,19 @@ def _parse_time_value(text: str) -> dt.time | None:
             return None
         return dt.time(hh, mm)
 
-    word_map = {
-        "ноль": 0,
-        "один": 1,
-        "одна": 1,
-        "два": 2,
-        "две": 2,
-        "три": 3,
-        "четыре": 4,
-        "пять": 5,
-        "шесть": 6,
-        "семь": 7,
-        "восемь": 8,
-        "девять": 9,
-        "десять": 10,
-        "одиннадцать": 11,
-        "двенадцать": 12,
-        "тринадцать": 13,
-        "четырнадцать": 14,
-        "пятнадцать": 15,
-        "шестнадцать": 16,
-        "семнадцать": 17,
-        "восемнадцать": 18,
-        "девятнадцать": 19,
-        "двадцать": 20,
-        "двадцать один": 21,
-        "двадцать два": 22,
-        "двадцать три": 23,
-    }
-
-    for word in sorted(word_map.keys(), key=len, reverse=True):
-        if re.search(rf"\b{re.escape(word)}\b", lower):
-            hh = apply_meridian(word_map[word])
-            if hh > 23:
-                return None
-            return dt.time(hh, 0)
+    words = [match.group(1) for match in HOUR_WORD_RE.finditer(lower)]
+    if words:
+        word = min(words, key=HOUR_WORD_RANK.__getitem__)
+        hh = apply_meridian(HOUR_WORD_MAP[word])
+        if hh > 23:
+            return None
+        return dt.time(hh, 0)
 
     return None
 
 
 def _has_due_intent(text: str) -> bool:
-    return bool(re.search(r"\b(срок|дедлайн|deadline)\b", text.lower()))
+    return bool(DUE_INTENT_RE.search(text.lower()))
 
 
 def _resolve_date_for_time(now: dt.datetime, date: dt.date | None, time_value: dt.time) -> dt.datetime:
@@ -376,17 +423,18 @@ def _resolve_date_for_time(now: dt.datetime, date: dt.date | None, time_value: d
 
 
 def _format_date_list(dates: list[dt.date]) -> str:
-    return ", ".join(sorted({d.isoformat() for d in dates}))
+    return ", ".join(d.isoformat() for d in sorted(set(dates)))
 
 
 def _extract_task_timing(
     text: str,
     now: dt.datetime,
 ) -> tuple[dt.date | None, tuple[dt.time, dt.time] | None, dt.time | None, int | None]:
-    date = resolve_date_ru(text, now)
-    time_range = _parse_time_range(text)
-    time_value = _parse_time_value(text)
-    duration = _parse_duration_minutes(text)
+    lower = text.lower()
+    date = _resolve_date_lower(lower, now)
+    time_range = _parse_time_range_lower(lower)
+    time_value = _parse_time_value_lower(lower)
+    duration = _parse_duration_lower(lower)
     if not date and time_range:
         start = dt.datetime.combine(now.date(), time_range[0])
         date = start.date() if start >= now else (now.date() + dt.timedelta(days=1))
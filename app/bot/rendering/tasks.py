@@ -58,9 +58,13 @@ def _render_day_plan(tasks, backlog, day: dt.date, routine, locale: str = "ru")
     return "\n".join(lines)
 
 
+# How many conflicting tasks the prompt lists.
+CONFLICT_PREVIEW = 3
+
+
 def _format_conflict_prompt(conflicts: list, locale: str = "ru") -> str:
     lines = [t("plan.conflict_header", locale=locale)]
-    for task in conflicts[:3]:
+    for task in conflicts[:CONFLICT_PREVIEW]:
         lines.append(
             t(
                 "plan.conflict_item",
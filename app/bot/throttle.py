@@ -24,6 +24,7 @@ class _UserState:
     last_text: str | None = None
     last_text_at: float = 0.0
     lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    serial: asyncio.Lock = field(default_factory=asyncio.Lock)
 
 
 class BotThrottle:
@@ -72,6 +73,10 @@ class BotThrottle:
     def get_lock(self, user_id: str) -> asyncio.Lock:
         return self._state(user_id).lock
 
+    def get_serial_lock(self, user_id: str) -> asyncio.Lock:
+        """FIFO lock that runs one user's updates in arrival order."""
+        return self._state(user_id).serial
+
 
 _throttle = BotThrottle()
 
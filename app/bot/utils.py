@@ -6,6 +6,13 @@ def now_local_naive() -> dt.datetime:
     return dt.datetime.now().replace(microsecond=0)
 
 
+def default_day_for_task(task) -> dt.date:
+    """The task's planned day, or today for backlog tasks."""
+    if task.planned_start is not None:
+        return task.planned_start.date()
+    return now_local_naive().date()
+
+
 def distance_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     r = 6371000
     phi1 = math.radians(lat1)
@@ -15,3 +22,25 @@ def distance_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
     return r * c
+
+
+METERS_PER_DEGREE = 111320.0
+
+
+def distance_m_sq_fast(lat1: float, lon1: float, lat2: float, lon2: float, cos_lat1: float | None = None) -> float:
+    """Squared equirectangular distance in m²; tracks ``distance_m`` closely over short ranges."""
+    if cos_lat1 is None:
+        cos_lat1 = math.cos(math.radians(lat1))
+    dy = (lat2 - lat1) * METERS_PER_DEGREE
+    dx = ((lon2 - lon1 + 180.0) % 360.0 - 180.0) * METERS_PER_DEGREE * cos_lat1
+    return dx * dx + dy * dy
+
+
+def within_radius(
+    lat1: float, lon1: float, lat2: float, lon2: float, radius: float, cos_lat1: float | None = None
+) -> bool:
+    """Planar pre-check rejects anything beyond twice the radius; Haversine decides the rest."""
+    if distance_m_sq_fast(lat1, lon1, lat2, lon2, cos_lat1) > 4 * radius * radius:
+        return False
+    return distance_m(lat1, lon1, lat2, lon2) <= radius
+
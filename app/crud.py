@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import datetime as dt
 import hmac
+import math
 
-from sqlalchemy import and_, or_, select
+from sqlalchemy import and_, delete, func, or_, select, update
 from sqlalchemy.orm import Session
 
 from app.models.checklist import TaskChecklist
@@ -45,6 +46,10 @@ def list_users(db: Session) -> list[User]:
     return list(db.execute(select(User).order_by(User.id.asc())).scalars())
 
 
+def list_active_users(db: Session) -> list[User]:
+    return list(db.execute(select(User).where(User.is_active.is_(True)).order_by(User.id.asc())).scalars())
+
+
 def get_user(db: Session, user_id: int) -> User | None:
     return db.execute(select(User).where(User.id == user_id)).scalar_one_or_none()
 
@@ -301,8 +306,8 @@ def update_task(db: Session, user_id: int, task_id: int, patch: TaskUpdate) -> T
     return update_task_fields(db, user_id, task_id, **data)
 
 
-def update_task_fields(db: Session, user_id: int, task_id: int, **fields) -> Task | None:
-    allowed = {
+_TASK_UPDATE_FIELDS = frozenset(
+    {
         "title",
         "notes",
         "planned_start",
@@ -324,21 +329,28 @@ def update_task_fields(db: Session, user_id: int, task_id: int, **fields) -> Tas
         "location_radius_m",
         "location_reminder_sent_at",
     }
-    unknown = set(fields) - allowed
-    if unknown:
-        raise ValueError(f"Unknown task fields: {sorted(unknown)}")
+)
 
-    task = db.execute(select(Task).where(and_(Task.id == task_id, Task.user_id == user_id))).scalar_one_or_none()
-    if not task:
-        return None
 
+def _normalize_task_fields(fields: dict) -> dict:
+    unknown = set(fields) - _TASK_UPDATE_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown task fields: {sorted(unknown)}")
     if ("planned_start" in fields or "due_at" in fields) and "reminder_sent_at" not in fields:
         fields["reminder_sent_at"] = None
-
     if "title" in fields and fields["title"] is not None:
         fields["title"] = fields["title"].strip()
     if "kind" in fields and fields["kind"] is not None:
         fields["kind"] = fields["kind"].lower()
+    return fields
+
+
+def update_task_fields(db: Session, user_id: int, task_id: int, **fields) -> Task | None:
+    _normalize_task_fields(fields)
+    task = db.execute(select(Task).where(and_(Task.id == task_id, Task.user_id == user_id))).scalar_one_or_none()
+    if not task:
+        return None
+
     for k, v in fields.items():
         setattr(task, k, v)
     db.add(task)
@@ -347,6 +359,62 @@ def update_task_fields(db: Session, user_id: int, task_id: int, **fields) -> Tas
     return task
 
 
+def apply_task_fields(db: Session, task: Task, *, commit: bool = True, **fields) -> Task:
+    """Update a task already loaded in this session, skipping the lookup and refresh."""
+    _normalize_task_fields(fields)
+    for k, v in fields.items():
+        setattr(task, k, v)
+    if commit:
+        db.commit()
+    return task
+
+
+def bulk_update_planned(
+    db: Session,
+    user_id: int,
+    updates: list[tuple[int, dt.datetime, dt.datetime]],
+    *,
+    schedule_source: str,
+    commit: bool = True,
+) -> None:
+    """Move several tasks in one executemany UPDATE, scoped to the owner in the WHERE clause.
+
+    Rows of other users simply match nothing. Loaded Task objects are not
+    synchronized, so callers should commit (which expires them) before reading
+    them again.
+    """
+    if not updates:
+        return
+    params = [
+        {
+            "id": task_id,
+            **_normalize_task_fields({"planned_start": start, "planned_end": end, "schedule_source": schedule_source}),
+        }
+        for task_id, start, end in updates
+    ]
+    db.execute(
+        update(Task).where(Task.user_id == user_id),
+        params,
+        execution_options={"synchronize_session": None},
+    )
+    if commit:
+        db.commit()
+
+
+def bulk_set_task_fields(db: Session, user_id: int, task_ids: list[int], *, commit: bool = True, **fields) -> int:
+    """Set the same fields on several owned tasks with a single UPDATE ... WHERE id IN."""
+    if not task_ids:
+        return 0
+    _normalize_task_fields(fields)
+    result = db.execute(
+        update(Task).where(and_(Task.user_id == user_id, Task.id.in_(task_ids))).values(**fields),
+        execution_options={"synchronize_session": "fetch"},
+    )
+    if commit:
+        db.commit()
+    return result.rowcount or 0
+
+
 def reschedule_task(
     db: Session,
     user_id: int,
@@ -389,6 +457,18 @@ def delete_task(db: Session, user_id: int, task_id: int) -> bool:
     return True
 
 
+def bulk_delete_tasks(db: Session, user_id: int, task_ids: list[int], *, commit: bool = True) -> int:
+    if not task_ids:
+        return 0
+    result = db.execute(
+        delete(Task).where(and_(Task.user_id == user_id, Task.id.in_(task_ids))),
+        execution_options={"synchronize_session": "fetch"},
+    )
+    if commit:
+        db.commit()
+    return result.rowcount or 0
+
+
 def delete_all_tasks(db: Session, user_id: int) -> int:
     tasks = list(db.execute(select(Task).where(Task.user_id == user_id)).scalars())
     for task in tasks:
@@ -432,6 +512,26 @@ def get_task(db: Session, user_id: int, task_id: int) -> Task | None:
     return db.execute(select(Task).where(and_(Task.id == task_id, Task.user_id == user_id))).scalar_one_or_none()
 
 
+def get_task_with_routine(db: Session, user_id: int, task_id: int) -> tuple[Task | None, RoutineConfig | None]:
+    """Load a task and its owner's routine in one round-trip; (None, None) if the task is missing."""
+    row = db.execute(
+        select(Task, RoutineConfig)
+        .outerjoin(RoutineConfig, RoutineConfig.user_id == Task.user_id)
+        .where(and_(Task.id == task_id, Task.user_id == user_id))
+    ).one_or_none()
+    if row is None:
+        return None, None
+    task, routine = row
+    return task, routine or ensure_routine(db, user_id)
+
+
+def get_tasks(db: Session, user_id: int, task_ids: list[int]) -> dict[int, Task]:
+    if not task_ids:
+        return {}
+    tasks = db.execute(select(Task).where(and_(Task.user_id == user_id, Task.id.in_(task_ids)))).scalars()
+    return {task.id: task for task in tasks}
+
+
 def list_scheduled_for_day(db: Session, user_id: int, day: dt.date) -> list[Task]:
     start, end = _day_bounds(day)
     return list(
@@ -502,15 +602,119 @@ def list_tasks_for_day(db: Session, user_id: int, day: dt.date) -> list[Task]:
     )
 
 
-def list_tasks_for_reminders(db: Session, user_id: int, now: dt.datetime, lead_minutes: int) -> list[Task]:
-    end = now + dt.timedelta(minutes=lead_minutes)
+def get_plan_buckets(db: Session, user_id: int, day: dt.date) -> tuple[list[Task], list[Task]]:
+    """Open tasks planned on the day and the open user backlog, in one query."""
+    start, end = _day_bounds(day)
+    rows = db.execute(
+        select(Task)
+        .where(
+            and_(
+                Task.user_id == user_id,
+                Task.is_done.is_(False),
+                or_(
+                    and_(Task.planned_start >= start, Task.planned_start < end),
+                    and_(Task.planned_start.is_(None), Task.task_type == "user"),
+                ),
+            )
+        )
+        .order_by(Task.planned_start.asc(), Task.priority.asc(), Task.created_at.asc(), Task.id.asc())
+    ).scalars()
+    scheduled: list[Task] = []
+    backlog: list[Task] = []
+    for task in rows:
+        (backlog if task.planned_start is None else scheduled).append(task)
+    return scheduled, backlog
+
+
+def list_open_scheduled_slim(db: Session, user_id: int, day: dt.date) -> list:
+    """Open timed tasks of the day as lightweight rows, for overlap and gap checks.
+
+    Only the columns the scheduler reads are selected (no notes, locations or
+    audit fields); rows are read-only and expose the same attribute names as Task.
+    """
+    start, end = _day_bounds(day)
     return list(
         db.execute(
-            select(Task)
+            select(
+                Task.id,
+                Task.title,
+                Task.task_type,
+                Task.kind,
+                Task.planned_start,
+                Task.planned_end,
+                Task.estimate_minutes,
+            )
             .where(
                 and_(
                     Task.user_id == user_id,
                     Task.is_done.is_(False),
+                    Task.planned_start >= start,
+                    Task.planned_start < end,
+                    Task.planned_end.is_not(None),
+                )
+            )
+            .order_by(Task.planned_start.asc(), Task.priority.asc(), Task.created_at.asc(), Task.id.asc())
+        )
+    )
+
+
+def find_overlapping_tasks(
+    db: Session, user_id: int, start: dt.datetime, end: dt.datetime, *, limit: int | None = None
+) -> list:
+    """Open timed tasks of start's day overlapping [start, end), as slim rows in start order.
+
+    Bounded to the same day as list_open_scheduled_slim, so cached and uncached
+    conflict checks agree on tasks carried over from the previous evening.
+    """
+    day_start, day_end = _day_bounds(start.date())
+    stmt = (
+        select(
+            Task.id,
+            Task.title,
+            Task.task_type,
+            Task.kind,
+            Task.planned_start,
+            Task.planned_end,
+            Task.estimate_minutes,
+        )
+        .where(
+            and_(
+                Task.user_id == user_id,
+                Task.is_done.is_(False),
+                Task.planned_start >= day_start,
+                Task.planned_start < day_end,
+                Task.planned_start < end,
+                Task.planned_end > start,
+            )
+        )
+        .order_by(Task.planned_start.asc(), Task.priority.asc(), Task.created_at.asc(), Task.id.asc())
+    )
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return list(db.execute(stmt))
+
+
+def _group_by_user(tasks) -> dict[int, list[Task]]:
+    grouped: dict[int, list[Task]] = {}
+    for task in tasks:
+        grouped.setdefault(task.user_id, []).append(task)
+    return grouped
+
+
+def list_tasks_for_reminders_by_user(
+    db: Session, user_ids: list[int], now: dt.datetime, lead_minutes: int
+) -> dict[int, list[Task]]:
+    """Reminder candidates for many users in one query, grouped by user_id."""
+    if not user_ids:
+        return {}
+    end = now + dt.timedelta(minutes=lead_minutes)
+    return _group_by_user(
+        db.execute(
+            select(Task)
+            .where(
+                and_(
+                    Task.user_id.in_(user_ids),
+                    Task.is_done.is_(False),
                     Task.reminder_sent_at.is_(None),
                     or_(
                         and_(Task.planned_start.is_not(None), Task.planned_start >= now, Task.planned_start <= end),
@@ -523,19 +727,21 @@ def list_tasks_for_reminders(db: Session, user_id: int, now: dt.datetime, lead_m
     )
 
 
-def list_tasks_for_start_prompt(
+def list_tasks_for_start_prompt_by_user(
     db: Session,
-    user_id: int,
+    user_ids: list[int],
     now: dt.datetime,
     window_minutes: int,
-) -> list[Task]:
+) -> dict[int, list[Task]]:
+    if not user_ids:
+        return {}
     start_window = now - dt.timedelta(minutes=window_minutes)
-    return list(
+    return _group_by_user(
         db.execute(
             select(Task)
             .where(
                 and_(
-                    Task.user_id == user_id,
+                    Task.user_id.in_(user_ids),
                     Task.task_type == "user",
                     Task.is_done.is_(False),
                     Task.planned_start.is_not(None),
@@ -565,13 +771,10 @@ def list_pending_start_prompts(db: Session, user_id: int) -> list[Task]:
     )
 
 
-def mark_start_prompt_sent(db: Session, user_id: int, task_id: int, at: dt.datetime) -> None:
-    task = get_task(db, user_id, task_id)
-    if not task:
-        return
-    task.start_prompt_sent_at = at
-    task.start_prompt_pending = True
-    db.add(task)
+def stamp_tasks(db: Session, task_ids: list[int], **fields) -> None:
+    """Set job bookkeeping fields on already-selected tasks with one UPDATE; the caller commits."""
+    if task_ids:
+        db.execute(update(Task).where(Task.id.in_(task_ids)).values(**fields))
 
 
 def clear_start_prompt(db: Session, user_id: int, task_id: int) -> None:
@@ -591,30 +794,81 @@ def mark_task_started(db: Session, user_id: int, task_id: int, at: dt.datetime)
     db.add(task)
 
 
-def list_tasks_with_location(db: Session, user_id: int) -> list[Task]:
-    return list(
-        db.execute(
-            select(Task).where(
-                and_(
-                    Task.user_id == user_id,
-                    Task.is_done.is_(False),
-                    Task.location_lat.is_not(None),
-                    Task.location_lon.is_not(None),
-                )
-            )
-        ).scalars()
-    )
+_METERS_PER_DEGREE = 111320.0
+
+
+def _location_box(lat: float, lon: float, radius_m: float):
+    """Bounding box around (lat, lon); longitude is left open near the poles and the antimeridian."""
+    dlat = radius_m / _METERS_PER_DEGREE
+    clauses = [Task.location_lat.between(lat - dlat, lat + dlat)]
+    cos_lat = math.cos(math.radians(lat))
+    if cos_lat > 0.01:
+        dlon = dlat / cos_lat
+        if lon - dlon >= -180.0 and lon + dlon <= 180.0:
+            clauses.append(Task.location_lon.between(lon - dlon, lon + dlon))
+    return and_(*clauses)
+
 
+# Users per statement: each adds one OR-ed box, and SQLite caps expression depth at 1000.
+_NEAR_BATCH_USERS = 100
 
-def list_late_tasks(db: Session, user_id: int, now: dt.datetime, grace_minutes: int) -> list[Task]:
+
+def list_tasks_near_by_user(
+    db: Session, points: dict[int, tuple[float, float]], radius_m: float
+) -> dict[int, list[Task]]:
+    """Open, not yet reminded located tasks in a box around each user's point.
+
+    The box is at least ``radius_m`` wide and grows to the largest radius stored on
+    the user's candidate tasks, so a task saved with a wider radius is never cut off.
+    Users are queried in fixed-size batches.
+    """
+    grouped: dict[int, list[Task]] = {}
+    user_ids = list(points)
+    for i in range(0, len(user_ids), _NEAR_BATCH_USERS):
+        batch = {user_id: points[user_id] for user_id in user_ids[i : i + _NEAR_BATCH_USERS]}
+        grouped.update(_list_tasks_near_batch(db, batch, radius_m))
+    return grouped
+
+
+def _list_tasks_near_batch(
+    db: Session, points: dict[int, tuple[float, float]], radius_m: float
+) -> dict[int, list[Task]]:
+    pending = and_(
+        Task.is_done.is_(False),
+        Task.location_lat.is_not(None),
+        Task.location_lon.is_not(None),
+        Task.location_reminder_sent_at.is_(None),
+    )
+    widest = dict(
+        db.execute(
+            select(Task.user_id, func.max(Task.location_radius_m))
+            .where(and_(Task.user_id.in_(list(points)), pending))
+            .group_by(Task.user_id)
+        ).all()
+    )
+    if not widest:
+        return {}
+    boxes = [
+        and_(Task.user_id == user_id, _location_box(lat, lon, max(radius_m, widest[user_id] or 0)))
+        for user_id, (lat, lon) in points.items()
+        if user_id in widest
+    ]
+    return _group_by_user(db.execute(select(Task).where(and_(or_(*boxes), pending))).scalars())
+
+
+def list_late_tasks_by_user(
+    db: Session, user_ids: list[int], now: dt.datetime, grace_minutes: int
+) -> dict[int, list[Task]]:
+    if not user_ids:
+        return {}
     if grace_minutes < 0:
         grace_minutes = 0
     threshold = now - dt.timedelta(minutes=grace_minutes)
-    return list(
+    return _group_by_user(
         db.execute(
             select(Task).where(
                 and_(
-                    Task.user_id == user_id,
+                    Task.user_id.in_(user_ids),
                     Task.is_done.is_(False),
                     Task.planned_start.is_not(None),
                     Task.planned_start <= threshold,
@@ -935,6 +1189,7 @@ def upsert_anchor(
     planned_start: dt.datetime,
     planned_end: dt.datetime,
     notes: str | None = None,
+    commit: bool = True,
 ) -> Task:
     existing = db.execute(
         select(Task).where(and_(Task.user_id == user_id, Task.anchor_key == anchor_key))
@@ -951,8 +1206,9 @@ def upsert_anchor(
         existing.priority = 1
         existing.estimate_minutes = int((planned_end - planned_start).total_seconds() // 60)
         db.add(existing)
-        db.commit()
-        db.refresh(existing)
+        if commit:
+            db.commit()
+            db.refresh(existing)
         return existing
 
     task = Task(
@@ -969,8 +1225,9 @@ def upsert_anchor(
         estimate_minutes=int((planned_end - planned_start).total_seconds() // 60),
     )
     db.add(task)
-    db.commit()
-    db.refresh(task)
+    if commit:
+        db.commit()
+        db.refresh(task)
     return task
 
 
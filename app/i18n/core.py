@@ -3,7 +3,7 @@ from __future__ import annotations
 import json
 from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 
 BASE_DIR = Path(__file__).resolve().parent
@@ -24,6 +24,7 @@ def _load_catalog(locale: str) -> dict[str, Any]:
     return data if isinstance(data, dict) else {}
 
 
+@lru_cache(maxsize=64)
 def normalize_locale(value: str | None, default: str = "ru") -> str:
     if not value:
         return default
@@ -39,6 +40,22 @@ def locale_for_user(user, default: str = "ru") -> str:
     return normalize_locale(getattr(user, "preferred_language", None), default=default)
 
 
+def template(key: str, locale: str = "ru") -> str:
+    """Unformatted catalog string, for callers that fill the same line many times."""
+    locale = normalize_locale(locale)
+    value = _load_catalog(locale).get(key)
+    if value is None and locale != "en":
+        value = _load_catalog("en").get(key)
+    return key if value is None else str(value)
+
+
+@lru_cache(maxsize=256)
+def formatter(key: str, locale: str = "ru") -> Callable[..., str]:
+    """Cached ``t`` for a fixed key and locale: the catalog lookup happens once."""
+    fill = template(key, locale).format_map
+    return lambda **vars: fill(_SafeDict(vars))
+
+
 def t(key: str, locale: str = "ru", **vars: Any) -> str:
     locale = normalize_locale(locale)
     data = _load_catalog(locale)
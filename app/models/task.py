@@ -12,6 +12,13 @@ class Task(Base):
         UniqueConstraint("user_id", "idempotency_key", name="uq_tasks_user_idempotency_key"),
         Index("ix_tasks_user_planned_start", "user_id", "planned_start"),
         Index("ix_tasks_reminder_sent_at", "reminder_sent_at"),
+        Index(
+            "ix_tasks_user_location_pending",
+            "user_id",
+            "location_reminder_sent_at",
+            "location_lat",
+            "location_lon",
+        ),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
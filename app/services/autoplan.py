@@ -5,7 +5,7 @@ from typing import Dict, List, Optional, Tuple
 
 from app import crud
 from app.services.routine_steps import ensure_day_routine_steps
-from app.services.slots import Interval, build_busy_intervals, day_bounds, gaps_from_busy
+from app.services.slots import build_busy_intervals, day_bounds, gaps_from_busy, merge_intervals
 
 
 def _find_first_fit_start(
@@ -51,10 +51,6 @@ def ensure_day_anchors(db, user_id: int, day: dt.date, routine) -> None:
     now = _now_local_naive()
     day_start, _day_end, morning_start, morning_end = day_bounds(day, routine, now=now)
 
-    # Base busy: already scheduled tasks (including existing anchors)
-    scheduled = crud.list_scheduled_for_day(db, user_id, day)
-    busy = build_busy_intervals(scheduled, routine)
-
     # Morning anchor is fixed at wake time.
     crud.upsert_anchor(
         db,
@@ -69,7 +65,9 @@ def ensure_day_anchors(db, user_id: int, day: dt.date, routine) -> None:
     # Routine steps follow the morning start and should block the timeline.
     ensure_day_routine_steps(db, user_id, day, routine)
 
-    # After inserting morning + routine steps, refresh busy
+    # Base busy: everything now scheduled on the day (including existing anchors).
+    # Meals below only change through this function, so the list is kept current
+    # in memory and committed once instead of re-read after every meal.
     scheduled = crud.list_scheduled_for_day(db, user_id, day)
     busy = build_busy_intervals(scheduled, routine)
 
@@ -94,7 +92,7 @@ def ensure_day_anchors(db, user_id: int, day: dt.date, routine) -> None:
 
         start = slot
         end = start + dt.timedelta(minutes=dur_min)
-        crud.upsert_anchor(
+        anchor = crud.upsert_anchor(
             db,
             user_id,
             anchor_key=key,
@@ -102,19 +100,16 @@ def ensure_day_anchors(db, user_id: int, day: dt.date, routine) -> None:
             kind="meal",
             planned_start=start,
             planned_end=end,
+            commit=False,
         )
 
-        # Reserve busy including meal buffer
-        busy.append(
-            Interval(
-                start=start,
-                end=end + dt.timedelta(minutes=routine.meal_buffer_after_min),
-            )
-        )
-        busy = build_busy_intervals(
-            crud.list_scheduled_for_day(db, user_id, day),
-            routine,
-        )
+        # An anchor moved in from another day joins the list; one already on
+        # this day is the same instance and was updated in place.
+        if not any(task is anchor for task in scheduled):
+            scheduled.append(anchor)
+        busy = build_busy_intervals(scheduled, routine)
+
+    db.commit()
 
 
 def autoplan_days(
@@ -183,18 +178,17 @@ def autoplan_days(
                 in_gym_start = depart + travel
                 in_gym_end = in_gym_start + core
 
-                crud.update_task_fields(
+                crud.apply_task_fields(
                     db,
-                    user_id,
-                    task.id,
+                    task,
                     planned_start=in_gym_start,
                     planned_end=in_gym_end,
                     schedule_source="autoplan",
+                    commit=False,
                 )
 
-                # Reserve depart..depart+total as busy interval
-                busy.append(Interval(depart, depart + total))
-                busy = build_busy_intervals(crud.list_scheduled_for_day(db, user_id, day), routine)
+                # Reserve the task with its travel/buffers, as a reload of the day would.
+                busy = merge_intervals(busy + build_busy_intervals([task], routine))
                 placed += 1
                 continue
 
@@ -205,19 +199,21 @@ def autoplan_days(
                 continue
 
             end = start + dur
-            crud.update_task_fields(
+            crud.apply_task_fields(
                 db,
-                user_id,
-                task.id,
+                task,
                 planned_start=start,
                 planned_end=end,
                 schedule_source="autoplan",
+                commit=False,
             )
 
-            busy.append(Interval(start, end))
-            busy = build_busy_intervals(crud.list_scheduled_for_day(db, user_id, day), routine)
+            busy = merge_intervals(busy + build_busy_intervals([task], routine))
             placed += 1
 
+        # One commit per day; the next day's workout rest check reads these rows.
+        db.commit()
+
         results.append(
             {
                 "date": day.isoformat(),
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import Generic, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class _Node(Generic[T]):
+    __slots__ = ("start", "end", "max_end", "left", "right", "item")
+
+    def __init__(self, start: dt.datetime, end: dt.datetime, item: T) -> None:
+        self.start = start
+        self.end = end
+        self.max_end = end
+        self.left: Optional[_Node[T]] = None
+        self.right: Optional[_Node[T]] = None
+        self.item = item
+
+
+def _update(node: _Node) -> None:
+    max_end = node.end
+    if node.left and node.left.max_end > max_end:
+        max_end = node.left.max_end
+    if node.right and node.right.max_end > max_end:
+        max_end = node.right.max_end
+    node.max_end = max_end
+
+
+def _build(nodes: List[_Node[T]], lo: int, hi: int) -> Optional[_Node[T]]:
+    if lo >= hi:
+        return None
+    mid = (lo + hi) // 2
+    node = nodes[mid]
+    node.left = _build(nodes, lo, mid)
+    node.right = _build(nodes, mid + 1, hi)
+    _update(node)
+    return node
+
+
+class DayIntervalIndex(Generic[T]):
+    """Augmented interval tree over [start, end) intervals, built balanced from a day's tasks.
+
+    Each node keeps the max end of its subtree, so overlap queries prune whole
+    branches and run in O(log N + k).
+    """
+
+    def __init__(self) -> None:
+        self._root: Optional[_Node[T]] = None
+        self._size = 0
+
+    @classmethod
+    def from_tasks(cls, tasks: Iterable) -> "DayIntervalIndex":
+        """Index tasks that have both planned_start and planned_end."""
+        nodes = [
+            _Node(task.planned_start, task.planned_end, task)
+            for task in tasks
+            if task.planned_start and task.planned_end
+        ]
+        nodes.sort(key=lambda n: n.start)
+        index = cls()
+        index._root = _build(nodes, 0, len(nodes))
+        index._size = len(nodes)
+        return index
+
+    def __len__(self) -> int:
+        return self._size
+
+    def query(self, start: dt.datetime, end: dt.datetime, limit: Optional[int] = None) -> List[T]:
+        """Return items overlapping [start, end), ordered by start; stop after ``limit`` hits."""
+        found: List[T] = []
+        stack: List[_Node[T]] = []
+        node = self._root
+        # In-order walk that skips subtrees which cannot overlap.
+        while stack or node:
+            while node and node.max_end > start:
+                stack.append(node)
+                node = node.left
+            if not stack:
+                break
+            node = stack.pop()
+            if node.start >= end:
+                break
+            if node.end > start:
+                found.append(node.item)
+                if limit is not None and len(found) >= limit:
+                    break
+            node = node.right
+        return found
@@ -19,6 +19,22 @@ RUS_WEEKDAY_RE = re.compile(
     r"\b(следующ(?:ий|ая|ее)\s+)?(пн|вт|ср|чт|пт|сб|вс|понедельник|вторник|среда|четверг|пятница|суббота|воскресенье)\b",
     re.IGNORECASE,
 )
+# Superset of the tokens the date/time patterns above can match; text without
+# any of them cannot carry a due date.
+TIMELIKE_RE = re.compile(
+    r"\d|today|tomorrow|next|сегодня|завтра|пн|вт|ср|чт|пт|сб|вс|"
+    r"понедельник|вторник|среда|четверг|пятница|суббота|воскресенье",
+    re.IGNORECASE,
+)
+PM_RE = re.compile(r"\b(pm|вечера|дня)\b")
+AM_RE = re.compile(r"\b(am|утра|ночи)\b")
+CHECKLIST_SEP_RE = re.compile(r"[;,]")
+RELATIVE_DAY_RE = re.compile(r"\b(today|tomorrow|сегодня|завтра|послезавтра)\b", re.IGNORECASE)
+PREPOSITION_RE = re.compile(r"\b(at|by|в|на|до)\b", re.IGNORECASE)
+FILLER_RE = re.compile(
+    r"\b(please|remind me to|i need to|i need|need to|need|add|добавь|добавить|напомни|напомнить|нужно|надо|сделать|задача|задачи)\b",
+    re.IGNORECASE,
+)
 
 WEEKDAY_MAP = {
     "mon": 0,
@@ -147,9 +163,9 @@ def _parse_time(text: str) -> dt.time | None:
     hh = int(m.group(1))
     mm = int(m.group(2) or 0)
     lower = text.lower()
-    if re.search(r"\b(pm|вечера|дня)\b", lower) and hh < 12:
+    if PM_RE.search(lower) and hh < 12:
         hh += 12
-    if re.search(r"\b(am|утра|ночи)\b", lower) and hh == 12:
+    if AM_RE.search(lower) and hh == 12:
         hh = 0
     if hh > 23 or mm > 59:
         return None
@@ -161,15 +177,26 @@ def _extract_checklist(text: str) -> tuple[str, list[str]]:
     if not m:
         return text, []
     tail = m.group(2)
-    items = [i.strip() for i in re.split(r"[;,]", tail) if i.strip()]
+    items = [i.strip() for i in CHECKLIST_SEP_RE.split(tail) if i.strip()]
     cleaned = text[: m.start()].strip()
     return cleaned, items
 
 
+def _strip_filler(text: str, original: str) -> str:
+    stripped = PREPOSITION_RE.sub("", text)
+    stripped = FILLER_RE.sub("", stripped)
+    title = " ".join(stripped.split()).strip()
+    return title or original
+
+
 def parse_quick_task(text: str, now: dt.datetime) -> QuickCaptureResult:
     original = text.strip()
     cleaned, checklist = _extract_checklist(original)
 
+    if not TIMELIKE_RE.search(cleaned):
+        # Plain backlog capture: only the filler-word cleanup applies.
+        return QuickCaptureResult(title=_strip_filler(cleaned, original), due_at=None, checklist_items=checklist)
+
     date = _parse_date(cleaned, now)
     time_text = DATE_RE.sub("", cleaned)
     time_text = DAY_MONTH_RE.sub("", time_text)
@@ -189,17 +216,7 @@ def parse_quick_task(text: str, now: dt.datetime) -> QuickCaptureResult:
     stripped = DAY_MONTH_RE.sub("", stripped)
     stripped = NEXT_WEEKDAY_RE.sub("", stripped)
     stripped = RUS_WEEKDAY_RE.sub("", stripped)
-    stripped = re.sub(r"\b(today|tomorrow|сегодня|завтра|послезавтра)\b", "", stripped, flags=re.IGNORECASE)
+    stripped = RELATIVE_DAY_RE.sub("", stripped)
     stripped = TIME_RE.sub("", stripped)
-    stripped = re.sub(r"\b(at|by|в|на|до)\b", "", stripped, flags=re.IGNORECASE)
-    stripped = re.sub(
-        r"\b(please|remind me to|i need to|i need|need to|need|add|добавь|добавить|напомни|напомнить|нужно|надо|сделать|задача|задачи)\b",
-        "",
-        stripped,
-        flags=re.IGNORECASE,
-    )
-    title = " ".join(stripped.split()).strip()
-    if not title:
-        title = original
 
-    return QuickCaptureResult(title=title, due_at=due_at, checklist_items=checklist)
+    return QuickCaptureResult(title=_strip_filler(stripped, original), due_at=due_at, checklist_items=checklist)
@@ -2,10 +2,11 @@ from __future__ import annotations
 
 import datetime as dt
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Iterable, List, Optional, Tuple
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Interval:
     start: dt.datetime
     end: dt.datetime
@@ -14,7 +15,7 @@ class Interval:
         return max(0, int((self.end - self.start).total_seconds() // 60))
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Gap:
     start: dt.datetime
     end: dt.datetime
@@ -23,7 +24,9 @@ class Gap:
         return max(0, int((self.end - self.start).total_seconds() // 60))
 
 
+@lru_cache(maxsize=512)
 def parse_hhmm(s: str) -> dt.time:
+    # A handful of routine values ("07:00", "23:00") dominate the calls; dt.time is immutable.
     s = s.strip()
     hh, mm = s.split(":")
     return dt.time(int(hh), int(mm))
@@ -51,17 +54,39 @@ def day_bounds(day: dt.date, routine, now: Optional[dt.datetime] = None) -> Tupl
     day_start = morning_end, but for 'today' clamps to max(morning_end, now_ceiled).
     day_end = bedtime - pre_sleep_buffer_min. (Assumes bedtime same day; if bedtime <= wake, treated as next day.)
     """
-    wake = _combine(day, parse_hhmm(routine.sleep_target_wakeup))
-    bed = _combine(day, parse_hhmm(routine.sleep_target_bedtime))
+    # Only the minute-ceiled 'now' on the same day affects the result, which keeps the cache key small.
+    now_floor = _ceil_to_next_minute(now) if now is not None and now.date() == day else None
+    return _day_bounds_cached(
+        day,
+        routine.sleep_target_wakeup,
+        routine.sleep_target_bedtime,
+        routine.post_wake_buffer_min,
+        routine.pre_sleep_buffer_min,
+        getattr(routine, "latest_task_end", None),
+        now_floor,
+    )
+
+
+@lru_cache(maxsize=256)
+def _day_bounds_cached(
+    day: dt.date,
+    wakeup: str,
+    bedtime: str,
+    post_wake_buffer_min: int,
+    pre_sleep_buffer_min: int,
+    latest_end: Optional[str],
+    now_floor: Optional[dt.datetime],
+) -> Tuple[dt.datetime, dt.datetime, dt.datetime, dt.datetime]:
+    wake = _combine(day, parse_hhmm(wakeup))
+    bed = _combine(day, parse_hhmm(bedtime))
     if bed <= wake:
         bed = bed + dt.timedelta(days=1)
 
     morning_start = wake
-    morning_end = wake + dt.timedelta(minutes=routine.post_wake_buffer_min)
+    morning_end = wake + dt.timedelta(minutes=post_wake_buffer_min)
     day_start = morning_end
 
-    day_end = bed - dt.timedelta(minutes=routine.pre_sleep_buffer_min)
-    latest_end = getattr(routine, "latest_task_end", None)
+    day_end = bed - dt.timedelta(minutes=pre_sleep_buffer_min)
     if latest_end:
         try:
             end_limit = _combine(day, parse_hhmm(latest_end))
@@ -69,8 +94,8 @@ def day_bounds(day: dt.date, routine, now: Optional[dt.datetime] = None) -> Tupl
         except Exception:
             pass
 
-    if now is not None and now.date() == day:
-        day_start = max(day_start, _ceil_to_next_minute(now))
+    if now_floor is not None:
+        day_start = max(day_start, now_floor)
 
     return day_start, day_end, morning_start, morning_end
 
@@ -89,37 +114,61 @@ def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
     return merged
 
 
-def _task_to_busy_interval(task, routine) -> Optional[Interval]:
-    if not task.planned_start or not task.planned_end:
-        return None
-
-    s = task.planned_start
-    e = task.planned_end
-    buffer_after = int(getattr(routine, "task_buffer_after_min", 0) or 0)
-
-    # Meals: buffer after
-    if getattr(task, "kind", None) == "meal":
-        e = e + dt.timedelta(minutes=routine.meal_buffer_after_min)
-
-    # Workouts: travel before/after
-    if getattr(task, "kind", None) == "workout":
-        travel = dt.timedelta(minutes=routine.workout_travel_oneway_min)
-        s = s - travel
-        e = e + travel
+def _merge_pairs(pairs: List[Tuple[dt.datetime, dt.datetime]]) -> List[Interval]:
+    """Merge raw (start, end) pairs; tuples sort without a key function."""
+    pairs.sort()
+    merged: List[Interval] = []
+    cur_s = cur_e = None
+    for s, e in pairs:
+        if cur_e is not None and s <= cur_e:
+            if e > cur_e:
+                cur_e = e
+            continue
+        if cur_e is not None:
+            merged.append(Interval(cur_s, cur_e))
+        cur_s, cur_e = s, e
+    if cur_e is not None:
+        merged.append(Interval(cur_s, cur_e))
+    return merged
 
-    if buffer_after > 0:
-        e = e + dt.timedelta(minutes=buffer_after)
 
-    return Interval(s, e)
+def _is_merged(intervals: List[Interval]) -> bool:
+    prev_end = None
+    for iv in intervals:
+        if iv.end <= iv.start or (prev_end is not None and iv.start <= prev_end):
+            return False
+        prev_end = iv.end
+    return True
 
 
 def build_busy_intervals(scheduled_tasks: Iterable, routine) -> List[Interval]:
-    intervals: List[Interval] = []
-    for t in scheduled_tasks:
-        iv = _task_to_busy_interval(t, routine)
-        if iv:
-            intervals.append(iv)
-    return merge_intervals(intervals)
+    # Routine-derived paddings are the same for every task, so resolve them once.
+    buffer_after = dt.timedelta(minutes=int(getattr(routine, "task_buffer_after_min", 0) or 0))
+    meal_after = None
+    travel = None
+    pairs: List[Tuple[dt.datetime, dt.datetime]] = []
+    for task in scheduled_tasks:
+        s = task.planned_start
+        e = task.planned_end
+        if not s or not e:
+            continue
+        kind = getattr(task, "kind", None)
+        # Meals: buffer after
+        if kind == "meal":
+            if meal_after is None:
+                meal_after = dt.timedelta(minutes=routine.meal_buffer_after_min)
+            e = e + meal_after
+        # Workouts: travel before/after
+        elif kind == "workout":
+            if travel is None:
+                travel = dt.timedelta(minutes=routine.workout_travel_oneway_min)
+            s = s - travel
+            e = e + travel
+        if buffer_after:
+            e = e + buffer_after
+        if e > s:
+            pairs.append((s, e))
+    return _merge_pairs(pairs)
 
 
 def gaps_from_busy(busy: List[Interval], start: dt.datetime, end: dt.datetime) -> List[Gap]:
@@ -128,7 +177,9 @@ def gaps_from_busy(busy: List[Interval], start: dt.datetime, end: dt.datetime) -
     if not busy:
         return [Gap(start, end)]
 
-    busy = merge_intervals(busy)
+    # build_busy_intervals output is already merged; only re-merge ad-hoc lists.
+    if not _is_merged(busy):
+        busy = merge_intervals(busy)
     gaps: List[Gap] = []
     cursor = start
 
@@ -157,6 +208,24 @@ def task_display_minutes(task, routine) -> int:
     return est if est > 0 else 30
 
 
+def _workout_padding(task, routine) -> Tuple[dt.timedelta, dt.timedelta]:
+    travel = dt.timedelta(minutes=routine.workout_travel_oneway_min)
+    core = dt.timedelta(minutes=max(task.estimate_minutes, routine.workout_block_min))
+    return travel, core
+
+
+def _default_padding(task, routine) -> Tuple[dt.timedelta, dt.timedelta]:
+    return dt.timedelta(0), dt.timedelta(minutes=task_display_minutes(task, routine))
+
+
+# Per-kind (travel each way, core block) used when placing a task into a gap.
+KIND_PADDING = {"workout": _workout_padding}
+
+
+def task_padding(task, routine) -> Tuple[dt.timedelta, dt.timedelta]:
+    return KIND_PADDING.get(task.kind, _default_padding)(task, routine)
+
+
 def format_gap_options(task, gaps: List[Gap], routine, day: dt.date) -> str:
     mins = task_display_minutes(task, routine)
     lines = []
@@ -170,26 +239,15 @@ def format_gap_options(task, gaps: List[Gap], routine, day: dt.date) -> str:
     lines.append("Выберите слот и, при необходимости, время внутри него:")
     lines.append(f"/place {task.id} <slot#> [HH:MM]\n")
 
+    travel, core = task_padding(task, routine)
     for idx, g in enumerate(gaps, start=1):
-        if task.kind == "workout":
-            travel = dt.timedelta(minutes=routine.workout_travel_oneway_min)
-            core = dt.timedelta(minutes=max(task.estimate_minutes, routine.workout_block_min))
-            earliest = g.start + travel
-            latest = g.end - (core + travel)
-            fit = latest >= earliest
-            fit_txt = "подходит" if fit else "не подходит"
-            lines.append(
-                f"{idx}) {g.start.strftime('%H:%M')}-{g.end.strftime('%H:%M')} ({g.duration_minutes()} мин) | "
-                f"диапазон старта: {earliest.strftime('%H:%M')}-{latest.strftime('%H:%M')} [{fit_txt}]"
-            )
-        else:
-            core = dt.timedelta(minutes=mins)
-            latest = g.end - core
-            fit = latest >= g.start
-            fit_txt = "подходит" if fit else "не подходит"
-            lines.append(
-                f"{idx}) {g.start.strftime('%H:%M')}-{g.end.strftime('%H:%M')} ({g.duration_minutes()} мин) | "
-                f"диапазон старта: {g.start.strftime('%H:%M')}-{latest.strftime('%H:%M')} [{fit_txt}]"
-            )
+        earliest = g.start + travel
+        latest = g.end - (core + travel)
+        fit = latest >= earliest
+        fit_txt = "подходит" if fit else "не подходит"
+        lines.append(
+            f"{idx}) {g.start.strftime('%H:%M')}-{g.end.strftime('%H:%M')} ({g.duration_minutes()} мин) | "
+            f"диапазон старта: {earliest.strftime('%H:%M')}-{latest.strftime('%H:%M')} [{fit_txt}]"
+        )
 
     return "\n".join(lines)
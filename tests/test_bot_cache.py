@@ -0,0 +1,103 @@
+import datetime as dt
+from types import SimpleNamespace
+
+from app import crud
+from app.bot import context as bot_context
+from app.bot.handlers import tasks as task_handlers
+from app.bot.context import (
+    cached_busy,
+    cached_locale,
+    forget_busy,
+    forget_locale,
+    store_busy,
+    store_locale,
+)
+
+
+DAY = dt.date(2026, 1, 1)
+
+
+def test_busy_cache_checks_stamp_and_ttl(monkeypatch):
+    context = SimpleNamespace(user_data={})
+    store_busy(context, 1, DAY, ("r", 1), ["busy"])
+
+    assert cached_busy(context, 1, DAY, ("r", 1)) == ["busy"]
+    assert cached_busy(context, 1, DAY, ("r", 2)) is None
+    assert cached_busy(context, 1, DAY + dt.timedelta(days=1), ("r", 1)) is None
+
+    monkeypatch.setattr(bot_context, "_BUSY_CACHE_TTL_SEC", -1.0)
+    assert cached_busy(context, 1, DAY, ("r", 1)) is None
+
+
+def test_busy_cache_dropped_only_for_written_days():
+    context = SimpleNamespace(user_data={})
+    other_day = DAY + dt.timedelta(days=1)
+    store_busy(context, 1, DAY, ("r", 1), ["busy"])
+    store_busy(context, 1, other_day, ("r", 1), ["other"])
+    store_busy(context, 2, DAY, ("r", 1), ["foreign"])
+
+    forget_busy(context, 1, DAY, None)
+    assert cached_busy(context, 1, DAY, ("r", 1)) is None
+    assert cached_busy(context, 1, other_day, ("r", 1)) == ["other"]
+
+    forget_busy(context, 1)
+    assert cached_busy(context, 1, other_day, ("r", 1)) is None
+    assert cached_busy(context, 2, DAY, ("r", 1)) == ["foreign"]
+
+
+def test_locale_cache_ttl_and_forget(monkeypatch):
+    context = SimpleNamespace(user_data={})
+    assert cached_locale(context) is None
+    store_locale(context, "en")
+    assert cached_locale(context) == "en"
+
+    forget_locale(context)
+    assert cached_locale(context) is None
+
+    store_locale(context, "ru")
+    monkeypatch.setattr(bot_context, "_LOCALE_CACHE_TTL_SEC", -1.0)
+    assert cached_locale(context) is None
+    assert cached_locale(SimpleNamespace()) is None
+
+
+def test_day_task_cache_lives_on_the_session(monkeypatch):
+    calls = []
+    monkeypatch.setattr(crud, "list_tasks_for_day", lambda db, user_id, day: calls.append(day) or ["task"])
+    context = SimpleNamespace(user_data={})
+    db = SimpleNamespace(info={})
+
+    assert task_handlers._cached_list_tasks(context, db, 1, DAY) == ["task"]
+    assert task_handlers._cached_list_tasks(context, db, 1, DAY) == ["task"]
+    assert calls == [DAY]
+    assert context.user_data == {}
+
+    task_handlers._invalidate_day(context, db, 1, DAY)
+    task_handlers._cached_list_tasks(context, db, 1, DAY)
+    assert calls == [DAY, DAY]
+
+    task_handlers._cached_list_tasks(context, SimpleNamespace(info={}), 1, DAY)
+    assert calls == [DAY, DAY, DAY]
+
+
+def test_day_index_is_released_with_the_session(monkeypatch):
+    row = SimpleNamespace(
+        id=7,
+        task_type="user",
+        planned_start=dt.datetime(2026, 1, 1, 9, 0),
+        planned_end=dt.datetime(2026, 1, 1, 10, 0),
+    )
+    calls = []
+    monkeypatch.setattr(crud, "list_open_scheduled_slim", lambda db, user_id, day: calls.append(day) or [row])
+    context = SimpleNamespace(user_data={})
+    db = SimpleNamespace(info={})
+
+    index = task_handlers._day_index(context, db, 1, DAY)
+    assert task_handlers._day_index(context, db, 1, DAY) is index
+    assert [t.id for t in index.query(row.planned_start, row.planned_end)] == [7]
+    assert calls == [DAY]
+    assert context.user_data == {}
+
+    task_handlers._invalidate_day(context, db, 1, DAY)
+    assert task_handlers._day_index(context, db, 1, DAY) is not index
+    assert calls == [DAY, DAY]
+
@@ -1,5 +1,7 @@
 import asyncio
+from types import SimpleNamespace
 
+from app.bot.middleware import throttle as throttle_middleware
 from app.bot.throttle import BotThrottle
 from app.settings import settings
 
@@ -61,3 +63,57 @@ def test_heavy_lock_blocks(monkeypatch):
 
     assert not denied.allowed
     assert denied.reason == "bot.throttle.busy"
+
+
+def test_serial_lock_orders_same_user():
+    throttle = BotThrottle()
+    order = []
+
+    async def _handler(name: str, delay: float):
+        async with throttle.get_serial_lock("u1"):
+            order.append(f"{name}-start")
+            await asyncio.sleep(delay)
+            order.append(f"{name}-end")
+
+    async def _run():
+        await asyncio.gather(_handler("a", 0.02), _handler("b", 0))
+
+    asyncio.run(_run())
+
+    assert order == ["a-start", "a-end", "b-start", "b-end"]
+    assert throttle.get_serial_lock("u1") is not throttle.get_serial_lock("u2")
+
+
+def test_heavy_command_queued_behind_text_update_is_not_busy(monkeypatch):
+    monkeypatch.setattr(settings, "BOT_COOLDOWN_SEC", 0)
+    monkeypatch.setattr(settings, "BOT_HEAVY_COOLDOWN_SEC", 0)
+    monkeypatch.setattr(settings, "BOT_BURST_MAX", 10)
+    throttle = BotThrottle()
+    monkeypatch.setattr(throttle_middleware, "throttle", lambda: throttle)
+    order = []
+
+    def _update(text):
+        async def reply_text(reply, **kwargs):
+            order.append(f"reply:{reply}")
+
+        message = SimpleNamespace(text=text, reply_text=reply_text)
+        return SimpleNamespace(message=message, effective_user=SimpleNamespace(id=1), effective_chat=None)
+
+    async def _text_handler(update, context):
+        # The text path takes the heavy lock itself, inside the serial lock.
+        lock = throttle.get_lock(throttle_middleware.update_user_key(update))
+        async with lock:
+            order.append("text")
+            await asyncio.sleep(0.02)
+
+    async def _heavy_handler(update, context):
+        order.append("heavy")
+
+    async def _run():
+        text = throttle_middleware.wrap_throttled(_text_handler)
+        heavy = throttle_middleware.wrap_throttled(_heavy_handler, heavy=True)
+        await asyncio.gather(text(_update("plan today"), None), heavy(_update("/plan"), None))
+
+    asyncio.run(_run())
+
+    assert order == ["text", "heavy"]
@@ -0,0 +1,194 @@
+import datetime as dt
+
+from app import crud
+from app.services.interval_index import DayIntervalIndex
+
+
+def _task(db, user_id, title, hour):
+    start = dt.datetime(2026, 1, 1, hour, 0)
+    return crud.create_task_fields(
+        db,
+        user_id,
+        title=title,
+        planned_start=start,
+        planned_end=start + dt.timedelta(minutes=30),
+        estimate_minutes=30,
+        priority=2,
+    )
+
+
+def test_bulk_delete_tasks_scopes_to_owner(test_app):
+    _, TestingSessionLocal = test_app
+    with TestingSessionLocal() as db:
+        owner = crud.get_or_create_user_by_chat_id(db, chat_id="bulk-del-owner")
+        other = crud.get_or_create_user_by_chat_id(db, chat_id="bulk-del-other")
+        first = _task(db, owner.id, "First", 9)
+        second = _task(db, owner.id, "Second", 10)
+        foreign = _task(db, other.id, "Foreign", 11)
+
+        deleted = crud.bulk_delete_tasks(db, owner.id, [first.id, second.id, foreign.id])
+
+        assert deleted == 2
+        assert crud.get_task(db, owner.id, first.id) is None
+        assert crud.get_task(db, owner.id, second.id) is None
+        assert crud.get_task(db, other.id, foreign.id) is not None
+
+
+def test_get_tasks_returns_owned_tasks_by_id(test_app):
+    _, TestingSessionLocal = test_app
+    with TestingSessionLocal() as db:
+        owner = crud.get_or_create_user_by_chat_id(db, chat_id="get-owner")
+        other = crud.get_or_create_user_by_chat_id(db, chat_id="get-other")
+        first = _task(db, owner.id, "First", 9)
+        foreign = _task(db, other.id, "Foreign", 10)
+
+        found = crud.get_tasks(db, owner.id, [first.id, foreign.id, 999])
+
+        assert list(found) == [first.id]
+        assert crud.get_tasks(db, owner.id, []) == {}
+
+
+def test_bulk_set_task_fields_single_statement(test_app):
+    _, TestingSessionLocal = test_app
+    with TestingSessionLocal() as db:
+        owner = crud.get_or_create_user_by_chat_id(db, chat_id="set-owner")
+        other = crud.get_or_create_user_by_chat_id(db, chat_id="set-other")
+        first = _task(db, owner.id, "First", 9)
+        second = _task(db, owner.id, "Second", 10)
+        foreign = _task(db, other.id, "Foreign", 11)
+
+        count = crud.bulk_set_task_fields(
+            db, owner.id, [first.id, second.id, foreign.id], planned_start=None, planned_end=None
+        )
+
+        assert count == 2
+        assert crud.get_task(db, owner.id, first.id).planned_start is None
+        assert crud.get_task(db, owner.id, second.id).planned_end is None
+        assert crud.get_task(db, other.id, foreign.id).planned_start is not None
+
+
+def test_get_task_with_routine_scopes_to_owner(test_app):
+    _, TestingSessionLocal = test_app
+    with TestingSessionLocal() as db:
+        owner = crud.get_or_create_user_by_chat_id(db, chat_id="joined-owner")
+        other = crud.get_or_create_user_by_chat_id(db, chat_id="joined-other")
+        task = _task(db, owner.id, "First", 9)
+
+        found, routine = crud.get_task_with_routine(db, owner.id, task.id)
+        assert found.id == task.id
+        assert routine.user_id == owner.id
+        assert crud.get_task_with_routine(db, other.id, task.id) == (None, None)
+
+
+def test_apply_task_fields_updates_loaded_task(test_app):
+    _, TestingSessionLocal = test_app
+    with TestingSessionLocal() as db:
+        user = crud.get_or_create_user_by_chat_id(db, chat_id="apply-owner")
+        task = _task(db, user.id, "First", 9)
+        crud.update_task_fields(db, user.id, task.id, reminder_sent_at=dt.datetime(2026, 1, 1, 8, 50))
+
+        new_start = dt.datetime(2026, 1, 1, 14, 0)
+        crud.apply_task_fields(db, task, planned_start=new_start, planned_end=new_start + dt.timedelta(minutes=30))
+
+        stored = crud.get_task(db, user.id, task.id)
+        assert stored.planned_start == new_start
+        assert stored.reminder_sent_at is None
+
+
+def test_get_plan_buckets_filters_in_sql(test_app):
+    _, TestingSessionLocal = test_app
+    with TestingSessionLocal() as db:
+        user = crud.get_or_create_user_by_chat_id(db, chat_id="plan-owner")
+        late = _task(db, user.id, "Late", 11)
+        early = _task(db, user.id, "Early", 9)
+        finished = _task(db, user.id, "Finished", 10)
+        crud.update_task_fields(db, user.id, finished.id, is_done=True)
+        backlog = crud.create_task_fields(db, user.id, title="Backlog", estimate_minutes=30, priority=2)
+        crud.create_task_fields(db, user.id, title="System", estimate_minutes=30, priority=2, task_type="system")
+
+        scheduled, open_backlog = crud.get_plan_buckets(db, user.id, dt.date(2026, 1, 1))
+
+        assert [t.id for t in scheduled] == [early.id, late.id]
+        assert [t.id for t in open_backlog] == [backlog.id]
+
+
+def test_bulk_update_planned_scopes_to_owner(test_app):
+    _, TestingSessionLocal = test_app
+    with TestingSessionLocal() as db:
+        owner = crud.get_or_create_user_by_chat_id(db, chat_id="planned-owner")
+        other = crud.get_or_create_user_by_chat_id(db, chat_id="planned-other")
+        first = _task(db, owner.id, "First", 9)
+        foreign = _task(db, other.id, "Foreign", 11)
+
+        new_start = dt.datetime(2026, 1, 1, 15, 0)
+        new_end = new_start + dt.timedelta(minutes=30)
+        crud.bulk_update_planned(
+            db,
+            owner.id,
+            [(first.id, new_start, new_end), (foreign.id, new_start, new_end)],
+            schedule_source="assistant",
+        )
+
+        moved = crud.get_task(db, owner.id, first.id)
+        assert moved.planned_start == new_start
+        assert moved.schedule_source == "assistant"
+        assert crud.get_task(db, other.id, foreign.id).planned_start == dt.datetime(2026, 1, 1, 11, 0)
+
+
+def test_list_open_scheduled_slim_skips_done_and_backlog(test_app):
+    _, TestingSessionLocal = test_app
+    with TestingSessionLocal() as db:
+        user = crud.get_or_create_user_by_chat_id(db, chat_id="slim-owner")
+        late = _task(db, user.id, "Late", 11)
+        early = _task(db, user.id, "Early", 9)
+        finished = _task(db, user.id, "Finished", 10)
+        crud.update_task_fields(db, user.id, finished.id, is_done=True)
+        crud.create_task_fields(db, user.id, title="Backlog", estimate_minutes=30, priority=2)
+
+        rows = crud.list_open_scheduled_slim(db, user.id, dt.date(2026, 1, 1))
+
+        assert [row.id for row in rows] == [early.id, late.id]
+        assert rows[0].title == "Early"
+        assert rows[0].planned_end == dt.datetime(2026, 1, 1, 9, 30)
+
+
+def test_find_overlapping_tasks_pushes_filter_to_sql(test_app):
+    _, TestingSessionLocal = test_app
+    with TestingSessionLocal() as db:
+        user = crud.get_or_create_user_by_chat_id(db, chat_id="overlap-owner")
+        other = crud.get_or_create_user_by_chat_id(db, chat_id="overlap-other")
+        first = _task(db, user.id, "First", 9)
+        second = _task(db, user.id, "Second", 10)
+        finished = _task(db, user.id, "Finished", 10)
+        crud.update_task_fields(db, user.id, finished.id, is_done=True)
+        _task(db, user.id, "Later", 12)
+        _task(db, other.id, "Foreign", 9)
+
+        start = dt.datetime(2026, 1, 1, 9, 15)
+        end = dt.datetime(2026, 1, 1, 10, 15)
+        assert [row.id for row in crud.find_overlapping_tasks(db, user.id, start, end)] == [first.id, second.id]
+        assert [row.id for row in crud.find_overlapping_tasks(db, user.id, start, end, limit=1)] == [first.id]
+        touching = crud.find_overlapping_tasks(db, user.id, dt.datetime(2026, 1, 1, 9, 30), dt.datetime(2026, 1, 1, 10, 0))
+        assert touching == []
+
+
+def test_overlap_paths_agree_on_tasks_from_the_previous_day(test_app):
+    _, TestingSessionLocal = test_app
+    with TestingSessionLocal() as db:
+        user = crud.get_or_create_user_by_chat_id(db, chat_id="overlap-midnight")
+        crud.create_task_fields(
+            db,
+            user.id,
+            title="Late",
+            planned_start=dt.datetime(2025, 12, 31, 23, 30),
+            planned_end=dt.datetime(2026, 1, 1, 0, 30),
+            estimate_minutes=60,
+            priority=2,
+        )
+        early = _task(db, user.id, "Early", 0)
+
+        start = dt.datetime(2026, 1, 1, 0, 0)
+        end = dt.datetime(2026, 1, 1, 1, 0)
+        cold = crud.find_overlapping_tasks(db, user.id, start, end)
+        warm = DayIntervalIndex.from_tasks(crud.list_open_scheduled_slim(db, user.id, start.date())).query(start, end)
+        assert [row.id for row in cold] == [row.id for row in warm] == [early.id]
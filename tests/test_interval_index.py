@@ -0,0 +1,51 @@
+import datetime as dt
+from types import SimpleNamespace
+
+from app.services.interval_index import DayIntervalIndex
+
+
+BASE = dt.datetime(2026, 1, 1, 9, 0)
+
+
+def _task(task_id: int, start_min: int, end_min: int):
+    return SimpleNamespace(
+        id=task_id,
+        planned_start=BASE + dt.timedelta(minutes=start_min),
+        planned_end=BASE + dt.timedelta(minutes=end_min),
+    )
+
+
+def _query(index, start_min: int, end_min: int) -> list[int]:
+    start = BASE + dt.timedelta(minutes=start_min)
+    end = BASE + dt.timedelta(minutes=end_min)
+    return [t.id for t in index.query(start, end)]
+
+
+def test_query_returns_overlaps_in_start_order():
+    tasks = [_task(1, 0, 30), _task(2, 60, 120), _task(3, 90, 100), _task(4, 200, 230)]
+    index = DayIntervalIndex.from_tasks(tasks)
+    assert _query(index, 20, 95) == [1, 2, 3]
+    assert _query(index, 120, 200) == []
+    assert _query(index, 0, 500) == [1, 2, 3, 4]
+
+
+def test_touching_intervals_do_not_overlap():
+    index = DayIntervalIndex.from_tasks([_task(1, 0, 30)])
+    assert _query(index, 30, 60) == []
+    assert _query(index, -30, 0) == []
+
+
+def test_unscheduled_tasks_are_skipped():
+    backlog = SimpleNamespace(id=9, planned_start=None, planned_end=None)
+    index = DayIntervalIndex.from_tasks([backlog, _task(1, 0, 30)])
+    assert len(index) == 1
+    assert _query(index, 0, 500) == [1]
+
+
+def test_query_limit_stops_after_first_hits():
+    tasks = [_task(1, 0, 30), _task(2, 10, 40), _task(3, 20, 50), _task(4, 200, 230)]
+    index = DayIntervalIndex.from_tasks(tasks)
+    start = BASE + dt.timedelta(minutes=15)
+    end = BASE + dt.timedelta(minutes=300)
+    assert [t.id for t in index.query(start, end, limit=2)] == [1, 2]
+    assert [t.id for t in index.query(start, end, limit=10)] == [1, 2, 3, 4]
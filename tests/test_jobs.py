@@ -0,0 +1,27 @@
+import asyncio
+
+from app.bot.jobs import _send_all
+
+
+class _FakeBot:
+    def __init__(self, fail_texts=()):
+        self.sent = []
+        self.fail_texts = set(fail_texts)
+
+    async def send_message(self, chat_id, text, **kwargs):
+        await asyncio.sleep(0)
+        if text in self.fail_texts:
+            raise RuntimeError("blocked")
+        self.sent.append((chat_id, text))
+
+
+def test_send_all_reports_per_message_result_and_keeps_chat_order():
+    bot = _FakeBot(fail_texts={"b2"})
+    messages = [(1, "a1", {}), (2, "b1", {}), (1, "a2", {}), (2, "b2", {}), (2, "b3", {})]
+
+    sent = asyncio.run(_send_all(bot, messages))
+
+    assert sent == [True, True, True, False, True]
+    assert [text for chat_id, text in bot.sent if chat_id == 1] == ["a1", "a2"]
+    assert [text for chat_id, text in bot.sent if chat_id == 2] == ["b1", "b3"]
+    assert asyncio.run(_send_all(bot, [])) == []
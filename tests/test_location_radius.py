@@ -0,0 +1,30 @@
+import random
+
+from app.bot.utils import distance_m, distance_m_sq_fast, within_radius
+
+
+def test_fast_distance_tracks_haversine_at_short_range():
+    rng = random.Random(7)
+    for _ in range(500):
+        lat = rng.uniform(-70, 70)
+        lon = rng.uniform(-180, 180)
+        lat2 = lat + rng.uniform(-0.01, 0.01)
+        lon2 = lon + rng.uniform(-0.01, 0.01)
+        exact = distance_m(lat, lon, lat2, lon2)
+        assert abs(distance_m_sq_fast(lat, lon, lat2, lon2) ** 0.5 - exact) <= 0.01 * exact + 0.5
+
+
+def test_within_radius_matches_haversine_check():
+    rng = random.Random(11)
+    for _ in range(500):
+        lat = rng.uniform(-70, 70)
+        lon = rng.uniform(-180, 180)
+        lat2 = lat + rng.uniform(-0.005, 0.005)
+        lon2 = lon + rng.uniform(-0.005, 0.005)
+        radius = rng.choice([50, 150, 300])
+        assert within_radius(lat, lon, lat2, lon2, radius) == (distance_m(lat, lon, lat2, lon2) <= radius)
+
+
+def test_within_radius_across_antimeridian():
+    assert within_radius(10.0, 179.9995, 10.0, -179.9995, 150)
+    assert not within_radius(10.0, 179.9, 10.0, -179.9, 150)
@@ -1,4 +1,8 @@
-from app.bot.parsing.commands import parse_command_text, parse_yes_no
+import datetime as dt
+
+import pytest
+
+from app.bot.parsing.commands import BadArgs, parse_command_text, parse_task_args, parse_yes_no
 
 
 def test_parse_command_text():
@@ -10,3 +14,42 @@ def test_parse_yes_no():
     assert parse_yes_no("\u0434\u0430") is True
     assert parse_yes_no("\u043d\u0435\u0442") is False
     assert parse_yes_no("maybe") is None
+
+
+def test_parse_task_args():
+    args = parse_task_args(
+        ["7", "09:30", "2026-01-02"], usage_key="usage", invalid_key="invalid", hhmm="required", date=True
+    )
+    assert (args.task_id, args.hhmm, args.date) == (7, dt.time(9, 30), dt.date(2026, 1, 2))
+    args = parse_task_args(["7", "2"], usage_key="usage", invalid_key="invalid", number=True, hhmm="optional")
+    assert (args.task_id, args.number, args.hhmm) == (7, 2, None)
+
+
+@pytest.mark.parametrize(
+    "args,key",
+    [
+        ([], "usage"),
+        (["x", "09:30"], "invalid"),
+    ],
+)
+def test_parse_task_args_errors(args, key):
+    with pytest.raises(BadArgs) as exc:
+        parse_task_args(
+            args, usage_key="usage", invalid_key="invalid", hhmm="required", time_key="time", date=True
+        )
+    assert exc.value.key == key
+
+
+@pytest.mark.parametrize(
+    "args,key",
+    [
+        (["7", "9-30"], "time"),
+        (["7", "09:30", "tomorrow"], "tasks.plan.invalid_date"),
+        (["7", "9-30", "tomorrow"], "tasks.plan.invalid_date"),
+    ],
+)
+def test_parse_task_args_defers_value_errors(args, key):
+    parsed = parse_task_args(
+        args, usage_key="usage", invalid_key="invalid", hhmm="required", time_key="time", date=True
+    )
+    assert (parsed.task_id, parsed.error) == (7, key)
@@ -1,4 +1,4 @@
-﻿from app.bot.parsing.text import extract_task_ids
+﻿from app.bot.parsing.text import extract_task_ids, extract_task_ids_from_args
 
 
 def test_extract_task_ids_plain_numbers():
@@ -12,3 +12,16 @@ def test_extract_task_ids_with_prefixes():
     assert extract_task_ids("ид 27") == [27]
     assert extract_task_ids("#27") == [27]
     assert extract_task_ids("№27") == [27]
+
+
+def test_extract_task_ids_from_args():
+    assert extract_task_ids_from_args(["27", "28"]) == [27, 28]
+    assert extract_task_ids_from_args(["#27", "id=28"]) == [27, 28]
+    assert extract_task_ids_from_args(["27,28"]) == [27, 28]
+    assert extract_task_ids_from_args([]) == []
+
+
+def test_extract_task_ids_dedupes_in_order():
+    assert extract_task_ids("5 3 5") == [5, 3]
+    assert extract_task_ids("#4 id4 #2") == [4, 2]
+    assert extract_task_ids_from_args(["7", "7", "1"]) == [7, 1]
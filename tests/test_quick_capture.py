@@ -8,3 +8,11 @@ def test_parse_quick_task_date_time():
     result = parse_quick_task("добавь созвон 31 декабря в 14:30", now)
     assert result.title.lower().startswith("созвон")
     assert result.due_at == dt.datetime(2025, 12, 31, 14, 30)
+
+
+def test_parse_quick_task_without_time_tokens():
+    now = dt.datetime(2025, 12, 30, 10, 0)
+    result = parse_quick_task("нужно купить молоко чеклист: хлеб, сыр", now)
+    assert result.title == "купить молоко"
+    assert result.due_at is None
+    assert result.checklist_items == ["хлеб", "сыр"]
@@ -58,3 +58,113 @@ def test_list_due_reminders():
 
     ids = {reminder.id for reminder in due}
     assert ids == {due1.id, due2.id}
+
+
+def test_task_reminders_grouped_by_user(test_app):
+    _, TestingSessionLocal = test_app
+    now = dt.datetime(2026, 1, 1, 9, 0)
+    with TestingSessionLocal() as db:
+        user1 = crud.get_or_create_user_by_chat_id(db, chat_id="bulk-rem-1")
+        user2 = crud.get_or_create_user_by_chat_id(db, chat_id="bulk-rem-2")
+        idle = crud.get_or_create_user_by_chat_id(db, chat_id="bulk-rem-3")
+        soon1 = crud.create_task_fields(
+            db, user1.id, title="Soon", planned_start=now + dt.timedelta(minutes=5), estimate_minutes=30, priority=2
+        )
+        soon2 = crud.create_task_fields(
+            db, user2.id, title="Soon too", planned_start=now + dt.timedelta(minutes=3), estimate_minutes=30, priority=2
+        )
+        crud.create_task_fields(
+            db, user1.id, title="Later", planned_start=now + dt.timedelta(hours=3), estimate_minutes=30, priority=2
+        )
+
+        grouped = crud.list_tasks_for_reminders_by_user(db, [user1.id, user2.id, idle.id], now, 15)
+
+        assert {uid: [t.id for t in tasks] for uid, tasks in grouped.items()} == {
+            user1.id: [soon1.id],
+            user2.id: [soon2.id],
+        }
+        assert crud.list_tasks_for_reminders_by_user(db, [], now, 15) == {}
+
+
+def test_tasks_near_filters_by_bounding_box(test_app):
+    _, TestingSessionLocal = test_app
+    with TestingSessionLocal() as db:
+        user = crud.get_or_create_user_by_chat_id(db, chat_id="near-1")
+        other = crud.get_or_create_user_by_chat_id(db, chat_id="near-2")
+        close = crud.create_task_fields(db, user.id, title="Close", estimate_minutes=30, priority=2)
+        far = crud.create_task_fields(db, user.id, title="Far", estimate_minutes=30, priority=2)
+        reminded = crud.create_task_fields(db, user.id, title="Reminded", estimate_minutes=30, priority=2)
+        foreign = crud.create_task_fields(db, other.id, title="Foreign", estimate_minutes=30, priority=2)
+        crud.update_task_location(db, user.id, close.id, 55.7510, 37.6180)
+        crud.update_task_location(db, user.id, far.id, 55.9000, 37.6180)
+        crud.update_task_location(db, user.id, reminded.id, 55.7510, 37.6180)
+        crud.update_task_location(db, other.id, foreign.id, 55.7510, 37.6180)
+        crud.update_task_fields(db, user.id, reminded.id, location_reminder_sent_at=dt.datetime(2026, 1, 1, 9, 0))
+
+        near = crud.list_tasks_near_by_user(db, {user.id: (55.7500, 37.6170)}, 2000)
+
+        assert [t.id for t in near[user.id]] == [close.id]
+        assert crud.list_tasks_near_by_user(db, {}, 2000) == {}
+
+
+def test_tasks_near_widens_box_for_large_radius(test_app):
+    _, TestingSessionLocal = test_app
+    with TestingSessionLocal() as db:
+        user = crud.get_or_create_user_by_chat_id(db, chat_id="near-wide")
+        wide = crud.create_task_fields(db, user.id, title="Wide", estimate_minutes=30, priority=2)
+        # ~3.3 km north of the user, saved with a 5 km radius from /task_location.
+        crud.update_task_location(db, user.id, wide.id, 55.7800, 37.6170, radius_m=5000)
+
+        near = crud.list_tasks_near_by_user(db, {user.id: (55.7500, 37.6170)}, 2000)
+
+        assert [t.id for t in near[user.id]] == [wide.id]
+
+
+def test_tasks_near_queries_users_in_batches(test_app, monkeypatch):
+    _, TestingSessionLocal = test_app
+    monkeypatch.setattr(crud, "_NEAR_BATCH_USERS", 2)
+    with TestingSessionLocal() as db:
+        points = {}
+        expected = {}
+        for i in range(5):
+            user = crud.get_or_create_user_by_chat_id(db, chat_id=f"near-batch-{i}")
+            task = crud.create_task_fields(db, user.id, title=f"Task {i}", estimate_minutes=30, priority=2)
+            crud.update_task_location(db, user.id, task.id, 55.7510, 37.6180)
+            points[user.id] = (55.7500, 37.6170)
+            expected[user.id] = [task.id]
+
+        near = crud.list_tasks_near_by_user(db, points, 2000)
+
+        assert {user_id: [t.id for t in tasks] for user_id, tasks in near.items()} == expected
+
+
+def test_stamp_tasks_updates_loaded_tasks(test_app):
+    _, TestingSessionLocal = test_app
+    now = dt.datetime(2026, 1, 1, 9, 0)
+    with TestingSessionLocal() as db:
+        user = crud.get_or_create_user_by_chat_id(db, chat_id="stamp-1")
+        first = crud.create_task_fields(db, user.id, title="First", estimate_minutes=30, priority=2)
+        second = crud.create_task_fields(db, user.id, title="Second", estimate_minutes=30, priority=2)
+        untouched = crud.create_task_fields(db, user.id, title="Untouched", estimate_minutes=30, priority=2)
+
+        crud.stamp_tasks(db, [first.id, second.id], start_prompt_sent_at=now, start_prompt_pending=True)
+        crud.stamp_tasks(db, [], late_prompt_sent_at=now)
+        db.commit()
+
+        assert first.start_prompt_pending is True
+        assert crud.get_task(db, user.id, second.id).start_prompt_sent_at == now
+        assert crud.get_task(db, user.id, untouched.id).start_prompt_sent_at is None
+
+
+def test_list_active_users_skips_inactive(test_app):
+    _, TestingSessionLocal = test_app
+    with TestingSessionLocal() as db:
+        active = crud.get_or_create_user_by_chat_id(db, chat_id="active-1")
+        inactive = crud.get_or_create_user_by_chat_id(db, chat_id="active-2")
+        inactive.is_active = False
+        db.commit()
+
+        ids = [user.id for user in crud.list_active_users(db)]
+
+        assert active.id in ids
+        assert inactive.id not in ids
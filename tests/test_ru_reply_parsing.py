@@ -44,6 +44,7 @@ def test_no_variants():
         "нет, спасибо",
         "no",
         "nope",
+        "don't",
     ]
     for text in samples:
         flags = parse_reply(text)
@@ -82,3 +83,21 @@ def test_help_variants():
     for text in samples:
         flags = parse_reply(text)
         assert flags.is_help, text
+
+
+def test_conflict_choice_variants():
+    from app.bot.handlers.tasks import _parse_conflict_choice
+
+    samples = {
+        "1": "replace",
+        "Замени": "replace",
+        "2": "move",
+        "перенеси на завтра": "move",
+        "ВСТАВЬ": "shift",
+        "3": "shift",
+        "move or replace": "replace",
+        "отмена": "cancel",
+        "12": None,
+    }
+    for text, expected in samples.items():
+        assert _parse_conflict_choice(text) == expected, text
@@ -0,0 +1,70 @@
+import datetime as dt
+from types import SimpleNamespace
+
+from app.services.slots import Interval, build_busy_intervals, day_bounds, gaps_from_busy, task_padding
+
+
+def _routine(**overrides):
+    base = dict(
+        sleep_target_wakeup="07:00",
+        sleep_target_bedtime="23:00",
+        post_wake_buffer_min=60,
+        pre_sleep_buffer_min=60,
+        latest_task_end=None,
+    )
+    base.update(overrides)
+    return SimpleNamespace(**base)
+
+
+def test_day_bounds_tracks_routine_changes():
+    day = dt.date(2026, 1, 1)
+    routine = _routine()
+    assert day_bounds(day, routine)[:2] == (dt.datetime(2026, 1, 1, 8, 0), dt.datetime(2026, 1, 1, 22, 0))
+    routine.latest_task_end = "20:00"
+    routine.sleep_target_wakeup = "06:00"
+    assert day_bounds(day, routine)[:2] == (dt.datetime(2026, 1, 1, 7, 0), dt.datetime(2026, 1, 1, 20, 0))
+
+
+def test_day_bounds_clamps_today_to_now():
+    day = dt.date(2026, 1, 1)
+    routine = _routine()
+    now = dt.datetime(2026, 1, 1, 12, 0, 30)
+    assert day_bounds(day, routine, now=now)[0] == dt.datetime(2026, 1, 1, 12, 1)
+    assert day_bounds(day + dt.timedelta(days=1), routine, now=now)[0] == dt.datetime(2026, 1, 2, 8, 0)
+
+
+def _at(hour: int, minute: int = 0) -> dt.datetime:
+    return dt.datetime(2026, 1, 1, hour, minute)
+
+
+def test_build_busy_intervals_pads_and_merges():
+    routine = _routine(task_buffer_after_min=0, meal_buffer_after_min=15, workout_travel_oneway_min=30)
+    tasks = [
+        SimpleNamespace(planned_start=_at(12), planned_end=_at(12, 30), kind="meal"),
+        SimpleNamespace(planned_start=_at(9), planned_end=_at(10), kind="workout"),
+        SimpleNamespace(planned_start=_at(10, 15), planned_end=_at(11), kind=None),
+        SimpleNamespace(planned_start=None, planned_end=None, kind=None),
+    ]
+    busy = build_busy_intervals(tasks, routine)
+    assert busy == [Interval(_at(8, 30), _at(11)), Interval(_at(12), _at(12, 45))]
+    assert [(g.start, g.end) for g in gaps_from_busy(busy, _at(8), _at(13))] == [
+        (_at(8), _at(8, 30)),
+        (_at(11), _at(12)),
+        (_at(12, 45), _at(13)),
+    ]
+
+
+def test_gaps_from_busy_merges_unsorted_input():
+    busy = [Interval(_at(10), _at(11)), Interval(_at(9), _at(10, 30))]
+    assert [(g.start, g.end) for g in gaps_from_busy(busy, _at(8), _at(12))] == [
+        (_at(8), _at(9)),
+        (_at(11), _at(12)),
+    ]
+
+
+def test_task_padding_by_kind():
+    routine = _routine(workout_travel_oneway_min=20, workout_block_min=60)
+    workout = SimpleNamespace(kind="workout", estimate_minutes=45)
+    other = SimpleNamespace(kind=None, estimate_minutes=0)
+    assert task_padding(workout, routine) == (dt.timedelta(minutes=20), dt.timedelta(minutes=60))
+    assert task_padding(other, routine) == (dt.timedelta(0), dt.timedelta(minutes=30))
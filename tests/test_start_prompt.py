@@ -17,9 +17,9 @@ def test_start_prompt_flow(test_app):
             estimate_minutes=30,
             priority=2,
         )
-        tasks = crud.list_tasks_for_start_prompt(db, user.id, now, window_minutes=10)
+        tasks = crud.list_tasks_for_start_prompt_by_user(db, [user.id], now, window_minutes=10).get(user.id, [])
         assert any(t.id == task.id for t in tasks)
-        crud.mark_start_prompt_sent(db, user.id, task.id, now)
+        crud.stamp_tasks(db, [task.id], start_prompt_sent_at=now, start_prompt_pending=True)
         db.commit()
         pending = crud.list_pending_start_prompts(db, user.id)
         assert any(t.id == task.id for t in pending)